@@ -1,6 +1,14 @@
 from django.contrib import admin
 
 from books.models import Book
+from library_service_api.pagination import EstimatedCountPaginator
 
 
-admin.site.register(Book)
+@admin.register(Book)
+class BookAdmin(admin.ModelAdmin):
+    list_display = ("title", "author", "cover", "inventory", "daily_fee")
+    # icontains lookups use the trigram indexes on PostgreSQL
+    search_fields = ("title", "author")
+    ordering = ("title", "author", "id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
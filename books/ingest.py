@@ -0,0 +1,96 @@
+import codecs
+import csv
+import json
+
+from rest_framework.exceptions import UnsupportedMediaType
+
+from books.cache import bump_catalog_version_on_commit
+from books.models import Book
+from books.serializers import BookSerializer
+
+
+JSON_LINES_MEDIA_TYPES = (
+    "application/x-ndjson",
+    "application/jsonl",
+    "application/json-lines",
+)
+CSV_MEDIA_TYPES = ("text/csv",)
+
+
+def iter_rows(stream, media_type: str):
+    """
+    Lazily yield `(row_number, row)` pairs from a JSON Lines or CSV body.
+    A row that cannot be decoded is yielded as an `Exception` instead. A
+    body that is not UTF-8 or not valid CSV ends the rows with one.
+    """
+    lines = codecs.iterdecode(stream or [], "utf-8")
+
+    if media_type in JSON_LINES_MEDIA_TYPES:
+        rows = iter_json_lines(lines)
+    elif media_type in CSV_MEDIA_TYPES:
+        rows = enumerate(csv.DictReader(lines), start=1)
+    else:
+        raise UnsupportedMediaType(media_type)
+
+    row_number = 0
+    try:
+        for row_number, row in rows:
+            yield row_number, row
+    except (UnicodeDecodeError, csv.Error) as error:
+        yield row_number + 1, ValueError(f"Unreadable body: {error}")
+
+
+def iter_json_lines(lines):
+    row_number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            row = error
+        else:
+            if not isinstance(row, dict):
+                row = ValueError("Expected a JSON object")
+        yield row_number, row
+
+
+def ingest_books(rows, batch_size: int, max_errors: int) -> dict:
+    """
+    Validate rows with `BookSerializer` and insert the valid ones with one
+    `bulk_create` per `batch_size` rows. Invalid rows are reported (up to
+    `max_errors` of them) and skipped. Only the current batch is held in
+    memory, so the size of the upload does not matter.
+    """
+    report = {"created": 0, "failed": 0, "errors": []}
+    batch = []
+
+    def flush():
+        Book.objects.bulk_create(batch, batch_size=batch_size)
+        # Each batch commits on its own, so a later failure must not leave
+        # committed rows behind a catalog cache still marked fresh
+        bump_catalog_version_on_commit()
+        report["created"] += len(batch)
+        batch.clear()
+
+    for row_number, row in rows:
+        if isinstance(row, Exception):
+            errors = {"non_field_errors": [str(row)]}
+        else:
+            serializer = BookSerializer(data=row)
+            if serializer.is_valid():
+                batch.append(Book(**serializer.validated_data))
+                if len(batch) >= batch_size:
+                    flush()
+                continue
+            errors = serializer.errors
+
+        report["failed"] += 1
+        if len(report["errors"]) < max_errors:
+            report["errors"].append({"row": row_number, "errors": errors})
+
+    if batch:
+        flush()
+
+    return report
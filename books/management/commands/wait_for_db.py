@@ -1,21 +1,65 @@
 import time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connections
 from django.db.utils import OperationalError
 
 
 class Command(BaseCommand):
+    help = (
+        "Wait until the default database accepts connections. With "
+        "DATABASE_POOL enabled, connect through the configured pool and "
+        "wait until it holds its minimum number of connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=None,
+            help="Give up after this many seconds (default: wait forever)",
+        )
 
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
-        db_conn = None
-        while not db_conn:
+        deadline = (
+            None
+            if options["timeout"] is None
+            else time.monotonic() + options["timeout"]
+        )
+        connection = connections["default"]
+        while True:
+            pool = getattr(connection, "pool", None)
             try:
-                connections["default"].ensure_connection()
-                db_conn = True
+                if pool is not None:
+                    self.wait_for_pool(connection, pool, deadline)
+                connection.ensure_connection()
+                break
             except OperationalError:
+                if pool is not None:
+                    # A pool whose wait timed out is closed for good, so the
+                    # next attempt needs a new one.
+                    connection.close_pool()
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise CommandError("Database unavailable")
                 self.stdout.write("Database unavailable, waiting 1 second")
                 time.sleep(1)
 
+        if pool is not None:
+            self.stdout.write(
+                f"Connection pool ready ({pool.min_size}-{pool.max_size} "
+                f"connections)"
+            )
+
         self.stdout.write(self.style.SUCCESS("Database available!"))
+
+    @staticmethod
+    def wait_for_pool(connection, pool, deadline) -> None:
+        # Filling the pool first keeps ensure_connection() from blocking
+        # for the whole DATABASE_POOL_TIMEOUT past the deadline.
+        timeout = pool.timeout
+        if deadline is not None:
+            timeout = min(timeout, max(deadline - time.monotonic(), 0))
+        with connection.wrap_database_errors:
+            pool.open()
+            pool.wait(timeout=timeout)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["title", "author", "id"], name="book_ordering_idx"
+            ),
+        ),
+    ]
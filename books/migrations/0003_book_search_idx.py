@@ -0,0 +1,32 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+SEARCH_INDEX = GinIndex(
+    SearchVector("title", "author", config="english"),
+    name="book_search_idx",
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.add_index(apps.get_model("books", "Book"), SEARCH_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.remove_index(apps.get_model("books", "Book"), SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_book_book_ordering_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,45 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    GinIndex(
+        fields=["title"],
+        opclasses=["gin_trgm_ops"],
+        name="book_title_trgm_idx",
+    ),
+    GinIndex(
+        fields=["author"],
+        opclasses=["gin_trgm_ops"],
+        name="book_author_trgm_idx",
+    ),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    book = apps.get_model("books", "Book")
+    for index in TRIGRAM_INDEXES:
+        schema_editor.add_index(book, index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    book = apps.get_model("books", "Book")
+    for index in TRIGRAM_INDEXES:
+        schema_editor.remove_index(book, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_search_idx"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,4 +1,48 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+
+
+# Largest value the integer inventory column holds on PostgreSQL
+MAX_INVENTORY = 2 ** 31 - 1
+
+
+class BookQuerySet(models.QuerySet):
+    def adjust_inventory(self, deltas: dict[int, int]) -> int:
+        """
+        Add `deltas[book_id]` to the inventory of every book in a single
+        UPDATE and return the number of updated rows. A book whose inventory
+        would drop below zero or exceed `MAX_INVENTORY` is skipped, so
+        callers compare the result with `len(deltas)` to detect shortages.
+
+        Rows are locked in id order before the UPDATE, which would otherwise
+        lock them in scan order, so overlapping adjustments queue up instead
+        of deadlocking.
+        """
+        if len(deltas) > 1:
+            list(
+                self.select_for_update()
+                .filter(id__in=deltas)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+        condition = Q()
+        for book_id, delta in deltas.items():
+            if delta < 0:
+                condition |= Q(id=book_id, inventory__gte=-delta)
+            else:
+                condition |= Q(
+                    id=book_id, inventory__lte=MAX_INVENTORY - delta
+                )
+
+        return self.filter(condition).update(
+            inventory=F("inventory") + Case(
+                *(
+                    When(id=book_id, then=Value(delta))
+                    for book_id, delta in deltas.items()
+                ),
+                default=Value(0),
+            )
+        )
 
 
 class Book(models.Model):
@@ -13,8 +57,15 @@ class Book(models.Model):
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=10, decimal_places=2)
 
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         ordering = ["title", "author"]
+        indexes = [
+            models.Index(
+                fields=["title", "author", "id"], name="book_ordering_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title}, {self.author}"
@@ -0,0 +1,79 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+
+SEARCH_CONFIG = "english"
+
+
+def book_search_vector():
+    """
+    tsvector over title and author. Must stay identical to the expression
+    of the `book_search_idx` GIN index (books migration 0003), otherwise
+    PostgreSQL cannot use the index for `@@` matches.
+    """
+    return SearchVector("title", "author", config=SEARCH_CONFIG)
+
+
+def search_books(queryset, search: str):
+    """
+    Filter books by a free-text query over title and author.
+
+    On PostgreSQL this is an index-backed full-text match ordered by rank.
+    Other databases (e.g. SQLite in tests) fall back to a case-insensitive
+    substring match on every word.
+    """
+    if connection.vendor != "postgresql":
+        for word in search.split():
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(author__icontains=word)
+            )
+        return queryset
+
+    query = SearchQuery(search, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        queryset
+        .alias(search_vector=book_search_vector())
+        .filter(search_vector=query)
+        .alias(rank=SearchRank(book_search_vector(), query))
+        .order_by("-rank", "title", "author", "id")
+    )
+
+
+def autocomplete_books(queryset, prefix: str, limit: int) -> list[dict]:
+    """
+    Return up to `limit` `{"id", "title", "author"}` suggestions for what
+    the user has typed so far.
+
+    On PostgreSQL titles and authors are matched with trigram word
+    similarity, which tolerates typos and is served by the trigram GIN
+    indexes (books migration 0004). Other databases fall back to a
+    case-insensitive substring match.
+    """
+    if connection.vendor != "postgresql":
+        queryset = queryset.filter(
+            Q(title__icontains=prefix) | Q(author__icontains=prefix)
+        ).order_by("title", "author", "id")
+    else:
+        queryset = (
+            queryset
+            .filter(
+                Q(title__trigram_word_similar=prefix)
+                | Q(author__trigram_word_similar=prefix)
+            )
+            .alias(
+                similarity=Greatest(
+                    TrigramWordSimilarity(prefix, "title"),
+                    TrigramWordSimilarity(prefix, "author"),
+                )
+            )
+            .order_by("-similarity", "title", "author", "id")
+        )
+
+    return list(queryset.values("id", "title", "author")[:limit])
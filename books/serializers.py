@@ -1,6 +1,13 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
-from books.models import Book
+from books.cache import bump_catalog_version_on_commit
+from books.models import MAX_INVENTORY, Book
+from borrowings.holds import allocate_to_holds, release_copies
+from library_service_api.fast_read import ValuesSerializer
 
 
 class BookSerializer(serializers.ModelSerializer):
@@ -14,3 +21,140 @@ class BookSerializer(serializers.ModelSerializer):
             "inventory",
             "daily_fee"
         )
+
+    def update(self, instance, validated_data):
+        """
+        Save the book. A higher inventory is a restock: the new copies go
+        to the book's hold queue first, the rest onto the shelf.
+        """
+        inventory = validated_data.pop("inventory", None)
+        with transaction.atomic():
+            instance.inventory = (
+                Book.objects
+                .select_for_update()
+                .values_list("inventory", flat=True)
+                .get(pk=instance.pk)
+            )
+            book = super().update(instance, validated_data)
+            if inventory is None or inventory == book.inventory:
+                return book
+            if inventory > book.inventory:
+                release_copies({book.pk: inventory - book.inventory})
+            else:
+                Book.objects.filter(pk=book.pk).update(inventory=inventory)
+                bump_catalog_version_on_commit()
+            book.refresh_from_db(fields=["inventory"])
+        return book
+
+
+daily_fee_to_representation = serializers.DecimalField(
+    max_digits=10, decimal_places=2
+).to_representation
+
+
+class BookValuesSerializer(ValuesSerializer):
+    """`BookSerializer` output built from `.values()` rows."""
+
+    values = ("id", "title", "author", "cover", "inventory", "daily_fee")
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "author": row["author"],
+            "cover": row["cover"],
+            "inventory": row["inventory"],
+            "daily_fee": daily_fee_to_representation(row["daily_fee"]),
+        }
+
+
+class BookAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Book
+        fields = ("id", "title", "author")
+
+
+class InventoryAdjustmentSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    delta = serializers.IntegerField(
+        min_value=-MAX_INVENTORY, max_value=MAX_INVENTORY
+    )
+
+
+class BookInventoryBatchSerializer(serializers.Serializer):
+    adjustments = InventoryAdjustmentSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.BOOK_INVENTORY_BATCH_MAX_SIZE,
+    )
+
+    def save(self, **kwargs):
+        deltas = Counter()
+        for adjustment in self.validated_data["adjustments"]:
+            deltas[adjustment["id"]] += adjustment["delta"]
+        deltas = dict(deltas)
+        if any(abs(delta) > MAX_INVENTORY for delta in deltas.values()):
+            self._raise_shortage(deltas)
+
+        try:
+            with transaction.atomic():
+                found = (
+                    Book.objects
+                    .select_for_update()
+                    .filter(id__in=deltas)
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                )
+                if len(found) != len(deltas):
+                    raise _Shortage()
+                # Restocked copies go to the books' hold queues first
+                restock = allocate_to_holds(
+                    {
+                        book_id: delta
+                        for book_id, delta in deltas.items()
+                        if delta > 0
+                    }
+                )
+                applied = {
+                    book_id: restock.get(book_id, min(delta, 0))
+                    for book_id, delta in deltas.items()
+                }
+                if Book.objects.adjust_inventory(applied) != len(applied):
+                    raise _Shortage()
+                inventories = list(
+                    Book.objects
+                    .filter(id__in=deltas)
+                    .order_by("id")
+                    .values("id", "inventory")
+                )
+        except _Shortage:
+            self._raise_shortage(deltas)
+
+        bump_catalog_version_on_commit()
+        return inventories
+
+    @staticmethod
+    def _raise_shortage(deltas):
+        inventories = dict(
+            Book.objects.filter(id__in=deltas).values_list("id", "inventory")
+        )
+        errors = {}
+        for book_id, delta in deltas.items():
+            if book_id not in inventories:
+                errors[book_id] = "Book not found"
+            elif not 0 <= inventories[book_id] + delta <= MAX_INVENTORY:
+                errors[book_id] = (
+                    f"Inventory would become {inventories[book_id] + delta}"
+                )
+        if not errors:
+            # The books changed again since the batch was rolled back
+            errors = {
+                book_id: "Inventory changed concurrently, try again"
+                for book_id in deltas
+            }
+        raise serializers.ValidationError({"adjustments": errors})
+
+
+class _Shortage(Exception):
+    """Rolls back a partially applied inventory batch."""
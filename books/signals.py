@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from books.cache import bump_catalog_version_on_commit
+from books.models import Book
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_catalog_cache(sender, **kwargs):
+    bump_catalog_version_on_commit()
@@ -1,14 +1,32 @@
+import contextlib
+import csv
+import io
+import json
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import OperationalError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from books.cache import get_catalog_cache
 from books.models import Book
-from books.serializers import BookSerializer
+from books.serializers import BookSerializer, BookValuesSerializer
+from borrowings.models import Borrowing
+from library_service_api.pagination import KeysetOrLimitOffsetPagination
 
 BOOKS_URL = reverse("books:book-list")
+AUTOCOMPLETE_URL = reverse("books:book-autocomplete")
+BULK_URL = reverse("books:book-bulk")
+EXPORT_URL = reverse("books:book-export")
+INVENTORY_URL = reverse("books:book-adjust-inventory")
 
 
 def detail_url(books_id):
@@ -17,6 +35,7 @@ def detail_url(books_id):
 
 class UnauthenticatedBooksApiTests(TestCase):
     def setUp(self):
+        get_catalog_cache().clear()
         self.client = APIClient()
         self.book1 = Book.objects.create(
             title="test_title1",
@@ -42,6 +61,110 @@ class UnauthenticatedBooksApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["results"], serializer.data)
 
+    def test_list_books_with_cursor_pagination(self):
+        for i in range(3):
+            Book.objects.create(
+                title="test_title1",
+                author=f"test_author{i}",
+                cover="ST",
+                inventory=1,
+                daily_fee=1,
+            )
+        expected = BookSerializer(
+            Book.objects.order_by("title", "author", "id"), many=True
+        ).data
+
+        pages = []
+        res = self.client.get(BOOKS_URL, {"cursor": "", "limit": 2})
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", res.data)
+            pages.append(res.data["results"])
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual(len(pages), 3)
+
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(res.data["results"], pages[1])
+
+    def test_search_books_ignores_cursor(self):
+        Book.objects.create(
+            title="The Hobbit",
+            author="J. R. R. Tolkien",
+            cover="ST",
+            inventory=1,
+            daily_fee=1,
+        )
+
+        res = self.client.get(BOOKS_URL, {"search": "hobbit", "cursor": ""})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(res.data["results"][0]["title"], "The Hobbit")
+
+    def test_list_books_with_invalid_cursor(self):
+        res = self.client.get(BOOKS_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_books_with_malformed_cursor_values(self):
+        encode = KeysetOrLimitOffsetPagination().encode_cursor
+        for position in (
+            ["title", "author", "not-an-id"],
+            ["title", "author", {"id": 1}],
+            [None, "author", 1],
+        ):
+            res = self.client.get(BOOKS_URL, {"cursor": encode(position)})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_books_by_title_and_author(self):
+        book3 = Book.objects.create(
+            title="The Hobbit",
+            author="J. R. R. Tolkien",
+            cover="ST",
+            inventory=1,
+            daily_fee=1,
+        )
+
+        res = self.client.get(BOOKS_URL, {"search": "hobbit tolkien"})
+
+        self.assertEqual(res.data["results"], [BookSerializer(book3).data])
+
+        res = self.client.get(BOOKS_URL, {"search": "test_author2"})
+
+        self.assertEqual(
+            res.data["results"], [BookSerializer(self.book2).data]
+        )
+
+    def test_autocomplete_books(self):
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "author2"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {
+                    "id": self.book2.id,
+                    "title": self.book2.title,
+                    "author": self.book2.author,
+                }
+            ]
+        )
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(AUTOCOMPLETE_URL, {"q": "Author2"})
+        self.assertEqual(cached.data, res.data)
+
+    def test_autocomplete_requires_min_length(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(AUTOCOMPLETE_URL, {"q": "t"})
+
+        self.assertEqual(res.data, [])
+
     def test_retrieve_book_detail(self):
         url = detail_url(self.book1.id)
         res = self.client.get(url)
@@ -75,6 +198,18 @@ class UnauthenticatedBooksApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_bulk_create_forbidden(self):
+        res = self.client.post(
+            BULK_URL, "", content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_forbidden(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_delete_book_forbidden(self):
         url = detail_url(self.book1.id)
         res = self.client.delete(url)
@@ -84,6 +219,7 @@ class UnauthenticatedBooksApiTests(TestCase):
 
 class AdminBookApiTests(TestCase):
     def setUp(self):
+        get_catalog_cache().clear()
         self.book1 = Book.objects.create(
             title="test_title1",
             author="test_author1",
@@ -134,6 +270,169 @@ class AdminBookApiTests(TestCase):
         self.assertEqual(self.book1.title, "update_title")
         self.assertEqual(self.book1.author, "update_author")
 
+    def test_bulk_create_books_from_json_lines(self):
+        rows = [
+            {"title": f"bulk_title{i}", "author": "bulk_author",
+             "cover": "HD", "inventory": i, "daily_fee": "1.50"}
+            for i in range(5)
+        ]
+        rows[3]["cover"] = "XX"
+        body = "\n".join(json.dumps(row) for row in rows) + "\n{broken\n"
+
+        res = self.client.post(
+            f"{BULK_URL}?batch_size=2",
+            body,
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 4)
+        self.assertEqual(res.data["failed"], 2)
+        self.assertEqual(
+            [error["row"] for error in res.data["errors"]], [4, 6]
+        )
+        self.assertIn("cover", res.data["errors"][0]["errors"])
+        self.assertEqual(
+            Book.objects.filter(author="bulk_author").count(), 4
+        )
+
+    def test_bulk_create_reports_unreadable_body(self):
+        valid = "title,author,cover,inventory,daily_fee\n" + (
+            "csv_title,csv_author,ST,3,2.00\n"
+        )
+        bodies = (
+            valid.encode() + b"caf\xe9,csv_author,ST,3,2.00\n",
+            valid + '"' + "x" * (csv.field_size_limit() + 1) + '"\n',
+        )
+        for body in bodies:
+            with self.subTest(body=body[:60]):
+                res = self.client.post(
+                    BULK_URL, body, content_type="text/csv"
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(res.data["created"], 1)
+                self.assertEqual(res.data["failed"], 1)
+                self.assertEqual(res.data["errors"][0]["row"], 2)
+
+    def test_bulk_create_books_from_csv(self):
+        body = (
+            "title,author,cover,inventory,daily_fee\n"
+            "csv_title1,csv_author,ST,3,2.00\n"
+            "csv_title2,csv_author,HD,-1,2.00\n"
+        )
+
+        res = self.client.post(BULK_URL, body, content_type="text/csv")
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["errors"][0]["row"], 2)
+        self.assertTrue(Book.objects.filter(title="csv_title1").exists())
+
+    def test_bulk_create_rejects_unknown_media_type(self):
+        res = self.client.post(
+            BULK_URL, "<books/>", content_type="application/xml"
+        )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    def test_adjust_inventory_in_batch(self):
+        payload = {
+            "adjustments": [
+                {"id": self.book1.id, "delta": 5},
+                {"id": self.book2.id, "delta": -2},
+                {"id": self.book1.id, "delta": -1},
+            ]
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(INVENTORY_URL, payload, format="json")
+        updates = [
+            query for query in queries.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {"id": self.book1.id, "inventory": 5},
+                {"id": self.book2.id, "inventory": 0},
+            ]
+        )
+        self.assertEqual(len(updates), 1)
+
+    def test_adjust_inventory_rejects_negative_result_atomically(self):
+        payload = {
+            "adjustments": [
+                {"id": self.book1.id, "delta": 3},
+                {"id": self.book2.id, "delta": -3},
+                {"id": 0, "delta": 1},
+            ]
+        }
+
+        res = self.client.post(INVENTORY_URL, payload, format="json")
+        self.book1.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            set(res.json()["adjustments"]), {str(self.book2.id), "0"}
+        )
+        self.assertEqual(self.book1.inventory, 1)
+
+    def test_adjust_inventory_rejects_out_of_range_delta(self):
+        payload = {"adjustments": [{"id": self.book1.id, "delta": 2 ** 31}]}
+
+        res = self.client.post(INVENTORY_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("delta", res.json()["adjustments"][0])
+
+    def test_adjust_inventory_rejects_overflowing_result(self):
+        max_delta = 2 ** 31 - 1
+        payload = {
+            "adjustments": [
+                {"id": self.book1.id, "delta": max_delta},
+                {"id": self.book2.id, "delta": max_delta},
+                {"id": self.book2.id, "delta": max_delta},
+            ]
+        }
+
+        res = self.client.post(INVENTORY_URL, payload, format="json")
+        self.book1.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            set(res.json()["adjustments"]),
+            {str(self.book1.id), str(self.book2.id)},
+        )
+        self.assertEqual(self.book1.inventory, 1)
+
+    def test_adjust_inventory_reports_shortage_gone_on_recheck(self):
+        payload = {"adjustments": [{"id": self.book1.id, "delta": -1}]}
+
+        # The update lost a race that had resolved by the time of the recheck
+        with patch.object(Book.objects, "adjust_inventory", return_value=0):
+            res = self.client.post(INVENTORY_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            list(res.json()["adjustments"]), [str(self.book1.id)]
+        )
+
+    def test_export_books(self):
+        res = self.client.get(EXPORT_URL)
+        rows = [
+            json.loads(line)
+            for line in b"".join(res.streaming_content).splitlines()
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            rows, BookSerializer(Book.objects.order_by("id"), many=True).data
+        )
+
     def test_delete_book(self):
         url = detail_url(self.book1.id)
 
@@ -141,3 +440,221 @@ class AdminBookApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Book.objects.filter(id=self.book1.id).exists())
+
+
+class BookValuesSerializerContractTests(TestCase):
+    def test_output_is_identical_to_book_serializer(self):
+        for daily_fee in ("0.50", "10", "12345678.99"):
+            Book.objects.create(
+                title="test_title",
+                author="test_author",
+                cover="ST",
+                inventory=0,
+                daily_fee=daily_fee,
+            )
+        books = Book.objects.order_by("id")
+
+        expected = JSONRenderer().render(
+            BookSerializer(books, many=True).data
+        )
+        actual = JSONRenderer().render(
+            BookValuesSerializer.many(
+                books.values(*BookValuesSerializer.values)
+            )
+        )
+
+        self.assertEqual(actual, expected)
+
+
+class BookCatalogCacheTests(TestCase):
+    def setUp(self):
+        get_catalog_cache().clear()
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=1,
+            daily_fee=12.23,
+        )
+        self.user = get_user_model().objects.create_user(
+            "test_admin@admin.com", "testpass", is_staff=True
+        )
+
+    def test_cached_list_is_served_without_queries(self):
+        first = self.client.get(BOOKS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(BOOKS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_not_modified(self):
+        url = detail_url(self.book.id)
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_book_write_invalidates_cache(self):
+        url = detail_url(self.book.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"title": "updated_title"})
+        self.client.force_authenticate(None)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["title"], "updated_title")
+
+    def test_borrowing_invalidates_cache(self):
+        url = detail_url(self.book.id)
+        self.client.get(url)
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("borrowings:borrowing-list"),
+                {
+                    "expected_return_date": "2999-01-01",
+                    "book": self.book.id,
+                },
+            )
+        self.client.force_authenticate(None)
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.data["inventory"], 0)
+        self.assertEqual(Borrowing.objects.count(), 1)
+
+
+class BookAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                "admin@test.com", is_staff=True, is_superuser=True
+            )
+        )
+
+    def create_books(self, count):
+        Book.objects.bulk_create(
+            Book(
+                title=f"title{i}",
+                author="author",
+                cover="HD",
+                inventory=1,
+                daily_fee=1,
+            )
+            for i in range(count)
+        )
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("admin:books_book_changelist"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self.create_books(2)
+        few = self.changelist_queries()
+        self.create_books(50)
+
+        self.assertEqual(self.changelist_queries(), few)
+        self.assertLessEqual(few, 6)
+
+
+class FakePool:
+    """Like psycopg_pool's: a wait that times out closes it for good."""
+
+    min_size = max_size = 1
+    timeout = 10
+
+    def __init__(self, ready):
+        self.ready = ready
+        self.closed = False
+
+    def open(self):
+        if self.closed:
+            raise OperationalError("pool cannot be reused")
+
+    def wait(self, timeout):
+        if not self.ready:
+            self.closed = True
+            raise OperationalError("pool initialization incomplete")
+
+    def close(self):
+        self.closed = True
+
+
+class FakePooledConnection:
+    wrap_database_errors = contextlib.nullcontext()
+
+    def __init__(self, failed_waits):
+        self.failed_waits = failed_waits
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = FakePool(ready=self.failed_waits == 0)
+            self.failed_waits -= 1
+        return self._pool
+
+    def close_pool(self):
+        self._pool.close()
+        self._pool = None
+
+    def ensure_connection(self):
+        pass
+
+
+class DatabaseAvailabilityTests(TestCase):
+    def test_wait_for_db(self):
+        out = io.StringIO()
+        call_command("wait_for_db", "--timeout", "1", stdout=out)
+
+        self.assertIn("Database available!", out.getvalue())
+
+    @patch("books.management.commands.wait_for_db.time.sleep")
+    def test_wait_for_db_retries_with_a_new_pool(self, sleep):
+        out = io.StringIO()
+        connection = FakePooledConnection(failed_waits=2)
+
+        with patch(
+            "books.management.commands.wait_for_db.connections",
+            {"default": connection},
+        ):
+            call_command("wait_for_db", stdout=out)
+
+        self.assertEqual(sleep.call_count, 2)
+        self.assertIn("Connection pool ready", out.getvalue())
+        self.assertIn("Database available!", out.getvalue())
+
+    def test_pool_metrics_are_staff_only(self):
+        client = APIClient()
+        url = reverse("db-pool-metrics")
+        client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "test123")
+        )
+        self.assertEqual(
+            client.get(url).status_code, status.HTTP_403_FORBIDDEN
+        )
+
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", "test123", is_staff=True
+            )
+        )
+        res = client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("pooling", res.data)
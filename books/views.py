@@ -1,11 +1,209 @@
-from rest_framework import viewsets
+from django.conf import settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
+from books.cache import (
+    CatalogCacheMixin,
+    catalog_digest,
+    get_catalog_cache,
+)
+from books.ingest import ingest_books, iter_rows
 from books.models import Book
 from books.permissions import IsAdminUserOrReadOnly
-from books.serializers import BookSerializer
+from books.search import autocomplete_books, search_books
+from books.serializers import (
+    BookAutocompleteSerializer,
+    BookInventoryBatchSerializer,
+    BookSerializer,
+    BookValuesSerializer,
+)
+from library_service_api.exports import stream_export
+from library_service_api.fast_read import FastReadMixin
+from library_service_api.pagination import KeysetOrLimitOffsetPagination
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    CatalogCacheMixin,
+    FastReadMixin,
+    viewsets.ModelViewSet
+):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = (IsAdminUserOrReadOnly, )
+    pagination_class = KeysetOrLimitOffsetPagination
+    cursor_ordering = ("title", "author", "id")
+    # Search results are ordered by rank, which the cursor doesn't carry.
+    cursor_excluded_params = ("search", )
+
+    def get_fast_serializer_class(self):
+        if self.action in ("list", "retrieve"):
+            return BookValuesSerializer
+        return None
+
+    def get_queryset(self):
+        queryset = self.queryset
+        search = self.request.query_params.get("search")
+
+        if search and self.action == "list":
+            queryset = search_books(queryset, search)
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description="Full-text search by title and author, "
+                            "best matches first (ex. ?search=tolkien)",
+                required=False
+            ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                description="Opt in to keyset pagination: pass an empty "
+                            "cursor for the first page, then follow the "
+                            "next/previous links (ex. ?cursor=). Ignored "
+                            "with ?search=",
+                required=False
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        summary="Autocomplete book titles and authors",
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                description="Text typed so far, at least "
+                            f"{settings.BOOK_AUTOCOMPLETE_MIN_LENGTH} "
+                            "characters (ex. ?q=tolk)",
+                required=True
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                description="Number of suggestions, at most "
+                            f"{settings.BOOK_AUTOCOMPLETE_MAX_LIMIT}",
+                required=False
+            ),
+        ],
+        responses=BookAutocompleteSerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False)
+    def autocomplete(self, request):
+        """Suggest books by title or author for a search box"""
+        prefix = " ".join(request.query_params.get("q", "").split())
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = settings.BOOK_AUTOCOMPLETE_LIMIT
+        limit = max(1, min(limit, settings.BOOK_AUTOCOMPLETE_MAX_LIMIT))
+
+        if len(prefix) < settings.BOOK_AUTOCOMPLETE_MIN_LENGTH:
+            return Response([])
+
+        cache = get_catalog_cache()
+        key = f"books:autocomplete:{catalog_digest(prefix.lower(), limit)}"
+        suggestions = cache.get(key)
+        if suggestions is None:
+            suggestions = autocomplete_books(self.queryset, prefix, limit)
+            cache.set(
+                key, suggestions, settings.BOOK_AUTOCOMPLETE_CACHE_TIMEOUT
+            )
+
+        return Response(suggestions)
+
+    @extend_schema(
+        summary="Bulk create books",
+        description="Streams a JSON Lines (application/x-ndjson) or CSV "
+                    "(text/csv) body, validates every row like "
+                    "POST /api/books/ and inserts valid rows in batches. "
+                    "Invalid rows are skipped and listed in the report.",
+        request=None,
+        parameters=[
+            OpenApiParameter(
+                name="batch_size",
+                type=OpenApiTypes.INT,
+                description="Rows per INSERT, at most "
+                            f"{settings.BOOK_BULK_MAX_BATCH_SIZE}",
+                required=False
+            ),
+        ],
+    )
+    @action(
+        methods=["POST"], detail=False, permission_classes=(IsAdminUser, )
+    )
+    def bulk(self, request):
+        """Endpoint to load many books from a JSON Lines or CSV upload"""
+        try:
+            batch_size = int(request.query_params["batch_size"])
+        except (KeyError, ValueError):
+            batch_size = settings.BOOK_BULK_BATCH_SIZE
+        batch_size = max(1, min(batch_size, settings.BOOK_BULK_MAX_BATCH_SIZE))
+
+        media_type = request.content_type.split(";")[0].strip()
+        report = ingest_books(
+            iter_rows(request.stream, media_type),
+            batch_size=batch_size,
+            max_errors=settings.BOOK_BULK_MAX_ERRORS,
+        )
+
+        return Response(report, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Adjust inventory of many books",
+        description="Applies all {id, delta} adjustments in one UPDATE. "
+                    "Restocked copies go to the books' hold queues first. "
+                    "If any book would end up with a negative inventory "
+                    "nothing is changed.",
+        request=BookInventoryBatchSerializer,
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="inventory",
+        permission_classes=(IsAdminUser, ),
+    )
+    def adjust_inventory(self, request):
+        """Endpoint to restock or write off many books at once"""
+        serializer = BookInventoryBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        inventories = serializer.save()
+
+        return Response(inventories, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Export books",
+        description="Streams the whole catalog as NDJSON or CSV.",
+        parameters=[
+            OpenApiParameter(
+                name="export_format",
+                type=OpenApiTypes.STR,
+                description="ndjson (default) or csv (ex. ?export_format=csv)",
+                required=False
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.BINARY},
+    )
+    @action(
+        methods=["GET"], detail=False, permission_classes=(IsAdminUser, )
+    )
+    def export(self, request):
+        """Endpoint to download every book in one streamed response"""
+        fields = ("id", "title", "author", "cover", "inventory", "daily_fee")
+        rows = (
+            self.get_queryset()
+            .order_by("id")
+            .values(*fields)
+            .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        )
+
+        return stream_export(request, rows, fields, filename="books")
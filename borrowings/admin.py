@@ -1,6 +1,39 @@
 from django.contrib import admin
 
 from borrowings.models import Borrowing
+from library_service_api.pagination import EstimatedCountPaginator
 
 
-admin.site.register(Borrowing)
+class ActiveBorrowingFilter(admin.SimpleListFilter):
+    """Filters on actual_return_date, covered by borrowing_active_idx."""
+
+    title = "status"
+    parameter_name = "is_active"
+
+    def lookups(self, request, model_admin):
+        return (("true", "Active"), ("false", "Returned"))
+
+    def queryset(self, request, queryset):
+        if self.value() == "true":
+            return queryset.filter(actual_return_date__isnull=True)
+        if self.value() == "false":
+            return queryset.filter(actual_return_date__isnull=False)
+        return queryset
+
+
+@admin.register(Borrowing)
+class BorrowingAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "book",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+    list_select_related = ("user", "book")
+    list_filter = (ActiveBorrowingFilter, )
+    autocomplete_fields = ("user", "book")
+    ordering = ("-borrow_date", "-id")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from books.cache import bump_catalog_version_on_commit
+from books.models import Book
+from borrowings.models import Hold
+from borrowings.notifications.outbox import enqueue_notifications
+
+
+def release_copies(copies: dict[int, int]) -> None:
+    """
+    Hand returned copies (`book id -> count`) to the heads of the books'
+    hold queues and put the rest back into inventory. Must run inside the
+    transaction that closes the borrowings.
+    """
+    restock = allocate_to_holds(copies)
+    if restock:
+        Book.objects.adjust_inventory(restock)
+        bump_catalog_version_on_commit()
+
+
+def allocate_to_holds(copies: dict[int, int]) -> dict[int, int]:
+    """
+    Set copies (`book id -> count`) aside for the heads of the books' hold
+    queues and return the copies left over per book, for the caller to
+    put into inventory.
+
+    Queue heads are read through `hold_queue_idx` and locked with SKIP
+    LOCKED, so simultaneous returns of the same book allocate to different
+    holds instead of waiting on each other.
+    """
+    restock = dict(copies)
+    queued = (
+        Hold.objects
+        .filter(book_id__in=copies, status=Hold.Status.WAITING)
+        .order_by()
+        .values_list("book_id", flat=True)
+        .distinct()
+    )
+
+    messages = []
+    for book_id in list(queued):
+        holds = list(
+            Hold.objects
+            .select_for_update(skip_locked=True, of=("self", ))
+            .select_related("book", "user")
+            .filter(book_id=book_id, status=Hold.Status.WAITING)
+            .order_by("id")[:copies[book_id]]
+        )
+        if not holds:
+            continue
+        Hold.objects.filter(id__in=[hold.id for hold in holds]).update(
+            status=Hold.Status.READY, ready_at=timezone.now()
+        )
+        restock[book_id] -= len(holds)
+        messages += [
+            f"Hold Ready\n\n"
+            f"User: {hold.user.email}\n"
+            f"Book: {hold.book.title}"
+            for hold in holds
+        ]
+    enqueue_notifications(messages)
+
+    return {book_id: count for book_id, count in restock.items() if count}
+
+
+def cancel_hold(hold_id: int) -> bool:
+    """
+    Cancel an open hold and return whether it was open. A copy already set
+    aside for a ready hold moves on to the next patron in the queue.
+    """
+    return close_hold(hold_id, Hold.Status.CANCELLED)
+
+
+def expire_ready_holds() -> int:
+    """
+    Expire ready holds whose patron has not borrowed the copy within
+    `HOLD_READY_DAYS` and pass each copy to the next patron in the queue.
+    Returns the number of expired holds.
+    """
+    deadline = timezone.now() - timedelta(days=settings.HOLD_READY_DAYS)
+    expired = Hold.objects.filter(
+        status=Hold.Status.READY, ready_at__lt=deadline
+    )
+    return sum(
+        close_hold(
+            hold_id,
+            Hold.Status.EXPIRED,
+            status=Hold.Status.READY,
+            ready_at__lt=deadline,
+        )
+        for hold_id in list(expired.values_list("id", flat=True))
+    )
+
+
+def close_hold(hold_id: int, outcome: str, **conditions) -> bool:
+    """
+    Close hold `hold_id` as `outcome` if it is open and matches
+    `conditions`, releasing its copy if one was set aside.
+    """
+    with transaction.atomic():
+        hold = (
+            Hold.objects
+            .select_for_update()
+            .filter(
+                id=hold_id, status__in=Hold.OPEN_STATUSES, **conditions
+            )
+            .first()
+        )
+        if hold is None:
+            return False
+        Hold.objects.filter(id=hold.id).update(status=outcome)
+        if hold.status == Hold.Status.READY:
+            release_copies({hold.book_id: 1})
+        return True
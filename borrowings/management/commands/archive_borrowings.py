@@ -0,0 +1,72 @@
+import calendar
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from borrowings.models import ArchivedBorrowing, Borrowing
+
+
+ARCHIVED_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book_id",
+    "user_id",
+)
+
+
+def months_before(day: date, months: int) -> date:
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    month += 1
+    return date(
+        year, month, min(day.day, calendar.monthrange(year, month)[1])
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Move borrowings returned more than --months ago from the hot "
+        "borrowings table to the archive, one short transaction per batch. "
+        "The API keeps reading them through the borrowings_history view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.BORROWING_ARCHIVE_AFTER_MONTHS,
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = months_before(timezone.now().date(), options["months"])
+        archived = 0
+
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    Borrowing.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(actual_return_date__lt=cutoff)
+                    .order_by("id")
+                    .values(*ARCHIVED_FIELDS)[:options["batch_size"]]
+                )
+                if not batch:
+                    break
+                ArchivedBorrowing.objects.bulk_create(
+                    ArchivedBorrowing(**row) for row in batch
+                )
+                Borrowing.objects.filter(
+                    id__in=[row["id"] for row in batch]
+                ).delete()
+            archived += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} borrowings returned before {cutoff}"
+            )
+        )
@@ -0,0 +1,121 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from books.models import Book
+from books.views import BookViewSet
+from borrowings.models import Borrowing
+from borrowings.views import BorrowingViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare limit/offset and keyset pagination latency at deep pages. "
+        "Test rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=50_000)
+        parser.add_argument("--borrowings", type=int, default=200_000)
+        parser.add_argument("--limit", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["books"], options["borrowings"])
+
+            for label, view, queryset, total in (
+                ("books", BookViewSet, Book.objects.all(), options["books"]),
+                (
+                    "borrowings",
+                    BorrowingViewSet,
+                    Borrowing.objects.select_related("book", "user"),
+                    options["borrowings"],
+                ),
+            ):
+                self.stdout.write(
+                    f"\n{label}: offset / limit-offset ms / keyset ms"
+                )
+                for offset in (0, total // 100, total // 10, total - 100):
+                    offset_ms, keyset_ms = self.measure(
+                        view, queryset, offset, options
+                    )
+                    self.stdout.write(
+                        f"{offset:>10} {offset_ms:>12.2f} {keyset_ms:>10.2f}"
+                    )
+
+            transaction.set_rollback(True)
+
+    def seed(self, books, borrowings):
+        self.stdout.write("Seeding benchmark data...")
+        Book.objects.bulk_create(
+            (
+                Book(
+                    title=f"Title {i:08d}",
+                    author=f"Author {i % 1000:04d}",
+                    cover=Book.Cover.HARD,
+                    inventory=1,
+                    daily_fee=1,
+                )
+                for i in range(books)
+            ),
+            batch_size=5_000,
+        )
+        user = get_user_model().objects.create_user(
+            "pagination-benchmark@example.com"
+        )
+        book_ids = list(Book.objects.values_list("id", flat=True))
+        Borrowing.objects.bulk_create(
+            (
+                Borrowing(
+                    expected_return_date=date.today() + timedelta(days=7),
+                    book_id=book_ids[i % len(book_ids)],
+                    user=user,
+                )
+                for i in range(borrowings)
+            ),
+            batch_size=5_000,
+        )
+
+        # borrow_date is auto_now_add, so spread the rows over the last year
+        # afterwards to get a realistic number of ties per date.
+        ids = Borrowing.objects.order_by("id").values_list("id", flat=True)
+        per_day = max(borrowings // 365, 1)
+        for day, start in enumerate(range(0, borrowings, per_day)):
+            Borrowing.objects.filter(
+                id__gte=ids[start], id__lt=ids[start] + per_day
+            ).update(borrow_date=date.today() - timedelta(days=365 - day))
+
+    def measure(self, view, queryset, offset, options):
+        limit = options["limit"]
+        factory = APIRequestFactory()
+        paginator_class = view.pagination_class
+
+        def timed(params):
+            best = float("inf")
+            for _ in range(options["repeat"]):
+                request = Request(factory.get("/", params))
+                paginator = paginator_class()
+                start = time.perf_counter()
+                paginator.paginate_queryset(queryset, request, view)
+                best = min(best, time.perf_counter() - start)
+            return best * 1000
+
+        offset_ms = timed({"limit": limit, "offset": offset})
+
+        paginator = paginator_class()
+        paginator.ordering = view.cursor_ordering
+        cursor = ""
+        if offset:
+            boundary = queryset.order_by(*view.cursor_ordering)[offset - 1]
+            cursor = paginator.encode_cursor(
+                paginator.get_position(boundary)
+            )
+        keyset_ms = timed({"limit": limit, "cursor": cursor})
+
+        return offset_ms, keyset_ms
@@ -0,0 +1,103 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from books.models import Book
+from books.serializers import BookSerializer, BookValuesSerializer
+from borrowings.models import Borrowing
+from borrowings.serializers import (
+    BorrowingListSerializer,
+    BorrowingDetailSerializer,
+    BorrowingListValuesSerializer,
+    BorrowingDetailValuesSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF serializers with the .values() fast path on pages of "
+        "rows (query + serialization + JSON rendering). Test rows are "
+        "created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+
+        with transaction.atomic():
+            self.seed(rows)
+
+            books = Book.objects.all()[:rows]
+            borrowings = Borrowing.objects.select_related(
+                "book", "user"
+            )[:rows]
+            cases = (
+                ("BookSerializer", books, BookSerializer,
+                 BookValuesSerializer),
+                ("BorrowingListSerializer", borrowings,
+                 BorrowingListSerializer, BorrowingListValuesSerializer),
+                ("BorrowingDetailSerializer", borrowings,
+                 BorrowingDetailSerializer, BorrowingDetailValuesSerializer),
+            )
+
+            self.stdout.write(
+                f"{'serializer':<28}{'DRF rows/s':>14}{'fast rows/s':>14}"
+                f"{'speedup':>10}"
+            )
+            for label, queryset, serializer, values_serializer in cases:
+                drf = self.measure(
+                    lambda: serializer(queryset.all(), many=True).data,
+                    options["repeat"],
+                )
+                fast = self.measure(
+                    lambda: values_serializer.many(
+                        queryset.values(*values_serializer.values)
+                    ),
+                    options["repeat"],
+                )
+                self.stdout.write(
+                    f"{label:<28}{rows / drf:>14,.0f}{rows / fast:>14,.0f}"
+                    f"{drf / fast:>9.1f}x"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, rows):
+        user = get_user_model().objects.create_user(
+            "serializer-benchmark@example.com"
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Title {i:06d}",
+                author=f"Author {i:06d}",
+                cover=Book.Cover.SOFT,
+                inventory=1,
+                daily_fee="1.25",
+            )
+            for i in range(rows)
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=date.today() + timedelta(days=7),
+                book=book,
+                user=user,
+            )
+            for book in books
+        )
+
+    @staticmethod
+    def measure(build, repeat):
+        renderer = JSONRenderer()
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            renderer.render(build())
+            best = min(best, time.perf_counter() - start)
+        return best
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from borrowings.notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Send pending notifications from the outbox in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep draining the outbox until interrupted",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox is empty (with --loop)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        while True:
+            sent, failed = drain_outbox(batch_size=batch_size)
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+
+            if not options["loop"]:
+                break
+            if sent < batch_size:
+                time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS("Outbox drained"))
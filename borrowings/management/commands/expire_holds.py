@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from borrowings.holds import expire_ready_holds
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire ready holds not borrowed within HOLD_READY_DAYS and pass "
+        "their copies to the next patrons in the queues (or back to "
+        "inventory). Run periodically, e.g. hourly."
+    )
+
+    def handle(self, *args, **options):
+        expired = expire_ready_holds()
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} holds"))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from borrowings.models import BorrowerAccount, BorrowingHistory
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every user's fines balance from returned borrowings, "
+        "archived ones included, with set-based queries: fines are summed "
+        "per user in the database and written with a single UPDATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        returned = BorrowingHistory.objects.filter(
+            actual_return_date__isnull=False
+        )
+        fines = Subquery(
+            returned
+            .filter(user=OuterRef("user"))
+            .with_fines()
+            .order_by()
+            .values("user")
+            .annotate(total=Sum("fine"))
+            .values("total"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        expected = Coalesce(fines, Value(0), output_field=fines.output_field)
+
+        with transaction.atomic():
+            BorrowerAccount.objects.bulk_create(
+                (
+                    BorrowerAccount(user_id=user_id)
+                    for user_id in returned
+                    .order_by()
+                    .values_list("user", flat=True)
+                    .distinct()
+                    .iterator(chunk_size=options["batch_size"])
+                ),
+                batch_size=options["batch_size"],
+                ignore_conflicts=True,
+            )
+            drifted = (
+                BorrowerAccount.objects
+                .alias(expected=expected)
+                .exclude(fines_balance=F("expected"))
+                .update(fines_balance=F("expected"))
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Corrected {drifted} fines balances")
+        )
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import (
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from borrowings.models import Borrowing, BorrowerAccount, BookCirculation
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the active borrowing counters of users and books from "
+        "the borrowings table and report how many had drifted. Counts are "
+        "grouped in the database and written with one UPDATE per table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        active = Borrowing.objects.filter(
+            actual_return_date__isnull=True
+        ).order_by()
+
+        with transaction.atomic():
+            for model, key in (
+                (BorrowerAccount, "user"),
+                (BookCirculation, "book"),
+            ):
+                drifted = self.reconcile(
+                    model, active, key, options["batch_size"]
+                )
+                self.stdout.write(
+                    f"{model._meta.verbose_name_plural}: "
+                    f"corrected {drifted} counters"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Counters reconciled"))
+
+    @staticmethod
+    def reconcile(model, active, key, batch_size) -> int:
+        model.objects.bulk_create(
+            (
+                model(pk=pk)
+                for pk in active
+                .values_list(key, flat=True)
+                .distinct()
+                .iterator(chunk_size=batch_size)
+            ),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        counts = Subquery(
+            active
+            .filter(**{key: OuterRef("pk")})
+            .values(key)
+            .annotate(count=Count("id"))
+            .values("count"),
+            output_field=IntegerField(),
+        )
+        return (
+            model.objects
+            .alias(expected=Coalesce(counts, Value(0)))
+            .exclude(active_borrowings=F("expected"))
+            .update(active_borrowings=F("expected"))
+        )
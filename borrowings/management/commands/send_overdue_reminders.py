@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from borrowings.models import Borrowing
+from borrowings.notifications.outbox import enqueue_notifications
+from library_service_api.pagination import keyset_filter
+
+
+OVERDUE_ORDERING = ("user", "expected_return_date", "id")
+LISTED_BOOKS_PER_USER = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue one Telegram reminder per user with overdue borrowings. "
+        "Overdue rows are read in keyset-paged batches through the "
+        "borrowing_overdue_idx partial index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        overdue = Borrowing.objects.filter(
+            actual_return_date__isnull=True, expected_return_date__lt=today
+        )
+
+        users = borrowings = 0
+        reminder = None
+        position = None
+        while True:
+            batch_queryset = overdue
+            if position is not None:
+                batch_queryset = overdue.filter(
+                    keyset_filter(OVERDUE_ORDERING, position)
+                )
+            batch = list(
+                batch_queryset
+                .order_by(*OVERDUE_ORDERING)
+                .values(
+                    "id",
+                    "user",
+                    "user__email",
+                    "book__title",
+                    "expected_return_date",
+                )[:options["batch_size"]]
+            )
+            if not batch:
+                break
+
+            messages = []
+            for row in batch:
+                if reminder and reminder["user"] != row["user"]:
+                    messages.append(self.format_reminder(reminder))
+                    reminder = None
+                if reminder is None:
+                    reminder = {
+                        "user": row["user"],
+                        "email": row["user__email"],
+                        "count": 0,
+                        "books": [],
+                    }
+                    users += 1
+                reminder["count"] += 1
+                if len(reminder["books"]) < LISTED_BOOKS_PER_USER:
+                    reminder["books"].append(row)
+
+            enqueue_notifications(messages)
+            borrowings += len(batch)
+            last = batch[-1]
+            position = [last["user"], last["expected_return_date"], last["id"]]
+
+        if reminder:
+            enqueue_notifications([self.format_reminder(reminder)])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Queued reminders for {users} users "
+                f"({borrowings} overdue borrowings)"
+            )
+        )
+
+    @staticmethod
+    def format_reminder(reminder) -> str:
+        lines = [
+            "Overdue Borrowings\n",
+            f"User: {reminder['email']}",
+            f"Overdue books: {reminder['count']}",
+        ]
+        lines += [
+            f"- {row['book__title']} (return by "
+            f"{row['expected_return_date']})"
+            for row in reminder["books"]
+        ]
+        if reminder["count"] > len(reminder["books"]):
+            lines.append(
+                f"...and {reminder['count'] - len(reminder['books'])} more"
+            )
+        return "\n".join(lines)
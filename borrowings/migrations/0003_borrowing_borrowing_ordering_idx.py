@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_book_book_ordering_idx"),
+        ("borrowings", "0002_outboxmessage"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["-borrow_date", "-id"], name="borrowing_ordering_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0003_borrowing_borrowing_ordering_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["user", "-borrow_date", "-id"], name="borrowing_user_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("actual_return_date__isnull", True)),
+                fields=["-borrow_date", "-id"],
+                name="borrowing_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("actual_return_date__isnull", True)),
+                fields=["user", "-borrow_date", "-id"],
+                name="borrowing_active_user_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="borrowing",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="borrowings",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
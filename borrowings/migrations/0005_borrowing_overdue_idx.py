@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_trigram_idx"),
+        ("borrowings", "0004_borrowing_access_path_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("actual_return_date__isnull", True)),
+                fields=["user", "expected_return_date", "id"],
+                name="borrowing_overdue_idx",
+            ),
+        ),
+    ]
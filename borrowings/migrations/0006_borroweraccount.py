@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0005_borrowing_overdue_idx"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BorrowerAccount",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="borrower_account",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "fines_balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("fines_balance__gt", 0)),
+                        fields=["-fines_balance"],
+                        name="account_debtors_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+    active = (
+        Borrowing.objects.filter(actual_return_date__isnull=True)
+        .order_by()
+    )
+    for model_name, key in (
+        ("BorrowerAccount", "user"),
+        ("BookCirculation", "book"),
+    ):
+        model = apps.get_model("borrowings", model_name)
+        model.objects.bulk_create(
+            [
+                model(**{f"{key}_id": pk, "active_borrowings": count})
+                for pk, count in active.values_list(key).annotate(Count("id"))
+            ],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=[key],
+            update_fields=["active_borrowings"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_trigram_idx"),
+        ("borrowings", "0006_borroweraccount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookCirculation",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="circulation",
+                        serialize=False,
+                        to="books.book",
+                    ),
+                ),
+                ("active_borrowings", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="borroweraccount",
+            name="active_borrowings",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Columns are listed explicitly so both sides of the UNION line up. A
+# migration that changes one of these columns has to drop and recreate
+# the view around the change.
+CREATE_HISTORY_VIEW = """
+CREATE VIEW borrowings_history AS
+SELECT id, borrow_date, expected_return_date, actual_return_date,
+       book_id, user_id
+FROM borrowings_borrowing
+UNION ALL
+SELECT id, borrow_date, expected_return_date, actual_return_date,
+       book_id, user_id
+FROM borrowings_archivedborrowing
+"""
+
+DROP_HISTORY_VIEW = "DROP VIEW borrowings_history"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_trigram_idx"),
+        ("borrowings", "0008_hold"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BorrowingHistory",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField()),
+                ("actual_return_date", models.DateField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "borrowing history",
+                "db_table": "borrowings_history",
+                "ordering": ["-borrow_date"],
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedBorrowing",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("borrow_date", models.DateField()),
+                ("expected_return_date", models.DateField()),
+                ("actual_return_date", models.DateField()),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_borrowings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-borrow_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["-borrow_date", "-id"],
+                        name="archived_borrowing_order_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "-borrow_date", "-id"],
+                        name="archived_borrowing_user_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(CREATE_HISTORY_VIEW, DROP_HISTORY_VIEW),
+    ]
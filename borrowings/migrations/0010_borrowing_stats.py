@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_trigram_idx"),
+        ("borrowings", "0009_borrowing_archive"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyBorrowingStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("shard", models.PositiveSmallIntegerField(default=0)),
+                ("borrowed", models.IntegerField(default=0)),
+                ("returned", models.IntegerField(default=0)),
+                ("loan_days", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "daily borrowing stats",
+            },
+        ),
+        migrations.AddField(
+            model_name="bookcirculation",
+            name="total_borrowings",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="bookcirculation",
+            index=models.Index(
+                fields=["-total_borrowings"], name="circulation_popular_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyborrowingstats",
+            constraint=models.UniqueConstraint(
+                fields=("day", "shard"), name="daily_stats_day_shard_unique"
+            ),
+        ),
+    ]
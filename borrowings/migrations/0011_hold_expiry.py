@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_book_trigram_idx"),
+        ("borrowings", "0010_borrowing_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="hold",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("WA", "WAITING"),
+                    ("RD", "READY"),
+                    ("FL", "FULFILLED"),
+                    ("CN", "CANCELLED"),
+                    ("EX", "EXPIRED"),
+                ],
+                default="WA",
+                max_length=2,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hold",
+            index=models.Index(
+                condition=models.Q(("status", "RD")),
+                fields=["ready_at"],
+                name="hold_ready_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0011_hold_expiry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxmessage",
+            name="next_attempt_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,12 +1,64 @@
+import random
+
+from django.conf import settings
 from django.utils import timezone
 
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
 from rest_framework.exceptions import ValidationError
 
 from books.models import Book
 
 
+class DaysBetween(models.Func):
+    """Whole days from the `start` date to the `end` date."""
+
+    arity = 2
+    output_field = models.IntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        start, end = self.get_source_expressions()
+        start_sql, start_params = compiler.compile(start)
+        end_sql, end_params = compiler.compile(end)
+        return f"({end_sql} - {start_sql})", (*end_params, *start_params)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        start, end = self.get_source_expressions()
+        start_sql, start_params = compiler.compile(start)
+        end_sql, end_params = compiler.compile(end)
+        return (
+            f"CAST(JULIANDAY({end_sql}) - JULIANDAY({start_sql}) AS INTEGER)",
+            (*end_params, *start_params),
+        )
+
+
+class BorrowingQuerySet(models.QuerySet):
+    def with_fines(self, today=None):
+        """
+        Annotate every borrowing with `fine`: days past
+        `expected_return_date` (until the return date, or `today` for
+        active borrowings) times the book's `daily_fee`.
+        """
+        today = today or timezone.now().date()
+        days_overdue = Greatest(
+            DaysBetween(
+                "expected_return_date",
+                Coalesce("actual_return_date", Value(today)),
+            ),
+            Value(0),
+        )
+        return self.annotate(
+            fine=models.ExpressionWrapper(
+                days_overdue * F("book__daily_fee"),
+                output_field=models.DecimalField(
+                    max_digits=12, decimal_places=2
+                ),
+            )
+        )
+
+
 class Borrowing(models.Model):
     borrow_date = models.DateField(auto_now_add=True)
     expected_return_date = models.DateField()
@@ -17,15 +69,46 @@ class Borrowing(models.Model):
         on_delete=models.CASCADE
     )
     user = models.ForeignKey(
-        get_user_model(), related_name="borrowings", on_delete=models.CASCADE
+        get_user_model(),
+        related_name="borrowings",
+        on_delete=models.CASCADE,
+        # Covered by the leading column of borrowing_user_idx
+        db_index=False,
     )
 
+    objects = BorrowingQuerySet.as_manager()
+
     class Meta:
         ordering = ["-borrow_date"]
+        indexes = [
+            models.Index(
+                fields=["-borrow_date", "-id"], name="borrowing_ordering_idx"
+            ),
+            models.Index(
+                fields=["user", "-borrow_date", "-id"],
+                name="borrowing_user_idx",
+            ),
+            models.Index(
+                fields=["-borrow_date", "-id"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_idx",
+            ),
+            models.Index(
+                fields=["user", "-borrow_date", "-id"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_active_user_idx",
+            ),
+            models.Index(
+                fields=["user", "expected_return_date", "id"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_overdue_idx",
+            ),
+        ]
 
     def __str__(self):
-        return (f"User:{self.user.email} "
-                f"(book:{self.book.title}, borrow_date:{self.borrow_date}")
+        # Ids only: rendering a borrowing must not load its user and book
+        return (f"Borrowing #{self.id} (user:{self.user_id}, "
+                f"book:{self.book_id}, borrow_date:{self.borrow_date})")
 
     def clean(self):
         if self.expected_return_date <= timezone.now().date():
@@ -47,3 +130,320 @@ class Borrowing(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
         return super().save(*args, **kwargs)
+
+    def fine_on(self, return_date):
+        return calculate_fine(
+            self.expected_return_date, return_date, self.book.daily_fee
+        )
+
+
+def calculate_fine(expected_return_date, return_date, daily_fee):
+    """Python counterpart of `BorrowingQuerySet.with_fines`."""
+    days_overdue = (return_date - expected_return_date).days
+    return max(days_overdue, 0) * daily_fee
+
+
+class ArchivedBorrowing(models.Model):
+    """
+    Borrowing returned long ago, moved out of the hot table by the
+    `archive_borrowings` command. Keeps the original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField()
+    book = models.ForeignKey(
+        Book,
+        related_name="archived_borrowings",
+        on_delete=models.CASCADE,
+    )
+    user = models.ForeignKey(
+        get_user_model(),
+        related_name="archived_borrowings",
+        on_delete=models.CASCADE,
+        # Covered by the leading column of archived_borrowing_user_idx
+        db_index=False,
+    )
+
+    objects = BorrowingQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-borrow_date"]
+        indexes = [
+            models.Index(
+                fields=["-borrow_date", "-id"],
+                name="archived_borrowing_order_idx",
+            ),
+            models.Index(
+                fields=["user", "-borrow_date", "-id"],
+                name="archived_borrowing_user_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived borrowing #{self.id}"
+
+
+class BorrowingHistory(models.Model):
+    """
+    Read-only `borrowings_history` view: hot borrowings UNION ALL archived
+    ones. Filters and ordering are pushed down into both tables' indexes.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_date = models.DateField()
+    expected_return_date = models.DateField()
+    actual_return_date = models.DateField(blank=True, null=True)
+    book = models.ForeignKey(
+        Book,
+        related_name="+",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    user = models.ForeignKey(
+        get_user_model(),
+        related_name="+",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+
+    objects = BorrowingQuerySet.as_manager()
+
+    class Meta:
+        managed = False
+        db_table = "borrowings_history"
+        ordering = ["-borrow_date"]
+        verbose_name_plural = "borrowing history"
+
+    def __str__(self):
+        return f"Borrowing #{self.id}"
+
+
+class CounterQuerySet(models.QuerySet):
+    """For models keyed by a one-to-one primary key that hold counters."""
+
+    def add(self, pk, guard=None, **deltas) -> bool:
+        """
+        Atomically add `deltas` to the counters of row `pk` with one
+        UPDATE, creating the row on first use. With a `guard` Q object the
+        update only applies while the guard holds; returns whether it did.
+        """
+        rows = self.filter(pk=pk)
+        if guard is not None:
+            rows = rows.filter(guard)
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        if rows.update(**changes):
+            return True
+        self.get_or_create(pk=pk)
+        return bool(rows.update(**changes))
+
+    def add_many(self, deltas: dict) -> None:
+        """
+        Apply `deltas[pk]` (a dict of field deltas) to many rows: one
+        INSERT for rows seen for the first time and a single UPDATE. Rows
+        are inserted and locked in pk order, so overlapping calls queue up
+        instead of deadlocking.
+        """
+        pks = sorted(deltas)
+        self.bulk_create(
+            [self.model(pk=pk) for pk in pks], ignore_conflicts=True
+        )
+        if len(pks) > 1:
+            list(
+                self.select_for_update()
+                .filter(pk__in=pks)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+        fields = {field for changes in deltas.values() for field in changes}
+        self.filter(pk__in=pks).update(
+            **{
+                field: F(field) + models.Case(
+                    *(
+                        models.When(pk=pk, then=Value(changes[field]))
+                        for pk, changes in deltas.items()
+                        if field in changes
+                    ),
+                    default=Value(0),
+                    output_field=self.model._meta.get_field(field),
+                )
+                for field in fields
+            }
+        )
+
+
+class BorrowerAccount(models.Model):
+    """Per-user totals maintained incrementally by the borrowing flows."""
+
+    user = models.OneToOneField(
+        get_user_model(),
+        primary_key=True,
+        related_name="borrower_account",
+        on_delete=models.CASCADE,
+    )
+    fines_balance = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0
+    )
+    active_borrowings = models.IntegerField(default=0)
+
+    objects = CounterQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-fines_balance"],
+                condition=models.Q(fines_balance__gt=0),
+                name="account_debtors_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Account of user #{self.user_id}"
+
+
+class BookCirculation(models.Model):
+    """Per-book totals maintained incrementally by the borrowing flows."""
+
+    book = models.OneToOneField(
+        Book,
+        primary_key=True,
+        related_name="circulation",
+        on_delete=models.CASCADE,
+    )
+    active_borrowings = models.IntegerField(default=0)
+    total_borrowings = models.IntegerField(default=0)
+
+    objects = CounterQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-total_borrowings"],
+                name="circulation_popular_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Circulation of book #{self.book_id}"
+
+
+class DailyStatsQuerySet(models.QuerySet):
+    def add(self, day, **deltas) -> None:
+        """
+        Add `deltas` to one of the day's `BORROWING_STATS_SHARDS` rows,
+        picked at random so concurrent borrowings and returns rarely wait
+        on the same row lock.
+        """
+        shard = random.randrange(settings.BORROWING_STATS_SHARDS)
+        rows = self.filter(day=day, shard=shard)
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        if not rows.update(**changes):
+            self.get_or_create(day=day, shard=shard)
+            rows.update(**changes)
+
+
+class DailyBorrowingStats(models.Model):
+    """
+    Borrowing volume per day, maintained by the borrow and return flows
+    and rebuilt from history by `rebuild_borrowing_stats`. A day is the
+    sum of its shard rows.
+    """
+
+    day = models.DateField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    borrowed = models.IntegerField(default=0)
+    returned = models.IntegerField(default=0)
+    # Sum of (return date - borrow date) over the day's returns
+    loan_days = models.IntegerField(default=0)
+
+    objects = DailyStatsQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "shard"], name="daily_stats_day_shard_unique"
+            ),
+        ]
+        verbose_name_plural = "daily borrowing stats"
+
+    def __str__(self):
+        return f"Borrowing stats for {self.day}"
+
+
+class OutboxMessage(models.Model):
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(sent_at__isnull=True),
+                name="outbox_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Outbox message #{self.id} (sent_at:{self.sent_at})"
+
+
+class Hold(models.Model):
+    """A patron's place in the queue for a copy of an out-of-stock book."""
+
+    class Status(models.TextChoices):
+        WAITING = "WA", "WAITING"
+        READY = "RD", "READY"
+        FULFILLED = "FL", "FULFILLED"
+        CANCELLED = "CN", "CANCELLED"
+        EXPIRED = "EX", "EXPIRED"
+
+    OPEN_STATUSES = (Status.WAITING, Status.READY)
+
+    book = models.ForeignKey(
+        Book,
+        related_name="holds",
+        on_delete=models.CASCADE,
+        # Covered by hold_queue_idx and hold_open_unique
+        db_index=False,
+    )
+    user = models.ForeignKey(
+        get_user_model(),
+        related_name="holds",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(
+        max_length=2, choices=Status.choices, default=Status.WAITING
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    ready_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["book", "id"],
+                condition=models.Q(status="WA"),
+                name="hold_queue_idx",
+            ),
+            models.Index(
+                fields=["ready_at"],
+                condition=models.Q(status="RD"),
+                name="hold_ready_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["book", "user"],
+                condition=models.Q(status__in=["WA", "RD"]),
+                name="hold_open_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Hold #{self.id} on book #{self.book_id}"
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from borrowings.models import OutboxMessage
+from borrowings.notifications import telegram
+
+
+# Failed messages are retried after RETRY_DELAY, doubling with every
+# further failure up to MAX_RETRY_DELAY, for as long as it takes.
+RETRY_DELAY = timedelta(seconds=10)
+MAX_RETRY_DELAY = timedelta(hours=1)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_DELAY * 2 ** min(attempts - 1, 16), MAX_RETRY_DELAY)
+
+
+def enqueue_notification(message: str) -> OutboxMessage:
+    """
+    Store a notification in the outbox as part of the current transaction.
+    It is delivered by `drain_outbox` only once the transaction commits.
+    """
+    return OutboxMessage.objects.create(message=message)
+
+
+def enqueue_notifications(messages: list[str]) -> None:
+    """Store many notifications in the outbox with a single INSERT."""
+    OutboxMessage.objects.bulk_create(
+        OutboxMessage(message=message) for message in messages
+    )
+
+
+def drain_outbox(batch_size: int = 100) -> tuple[int, int]:
+    """
+    Send one batch of due outbox messages and return the number of sent
+    and failed messages. Rows are claimed with SKIP LOCKED and leased by
+    moving `next_attempt_at` past the longest the batch can take, then the
+    claim commits, so no locks are held while Telegram is called and
+    several workers can drain the outbox concurrently. Rows of a worker
+    that dies mid-batch are picked up again once their lease runs out.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=batch_size * telegram.TELEGRAM_TIMEOUT)
+    with transaction.atomic():
+        batch = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(sent_at__isnull=True, next_attempt_at__lte=now)
+            .order_by("id")[:batch_size]
+        )
+        OutboxMessage.objects.filter(
+            id__in=[outbox_message.id for outbox_message in batch]
+        ).update(next_attempt_at=now + lease + RETRY_DELAY)
+
+    sent_ids = []
+    failed = []
+    for outbox_message in batch:
+        try:
+            telegram.send_telegram_notification(
+                message=outbox_message.message
+            )
+        except Exception as error:
+            outbox_message.attempts += 1
+            outbox_message.last_error = str(error)
+            outbox_message.next_attempt_at = timezone.now() + retry_delay(
+                outbox_message.attempts
+            )
+            failed.append(outbox_message)
+        else:
+            sent_ids.append(outbox_message.id)
+
+    with transaction.atomic():
+        if sent_ids:
+            OutboxMessage.objects.filter(id__in=sent_ids).update(
+                sent_at=timezone.now()
+            )
+        if failed:
+            OutboxMessage.objects.bulk_update(
+                failed, ["attempts", "last_error", "next_attempt_at"]
+            )
+
+    return len(sent_ids), len(failed)
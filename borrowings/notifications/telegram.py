@@ -9,6 +9,7 @@ load_dotenv()
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+TELEGRAM_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", 5))
 
 
 def send_telegram_notification(message: str) -> None:
@@ -25,4 +26,7 @@ def send_telegram_notification(message: str) -> None:
         "parse_mode": "HTML",
     }
 
-    requests.post(TELEGRAM_API_URL, data=payload)
+    response = requests.post(
+        TELEGRAM_API_URL, data=payload, timeout=TELEGRAM_TIMEOUT
+    )
+    response.raise_for_status()
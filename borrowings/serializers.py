@@ -1,11 +1,36 @@
+from collections import Counter, defaultdict
+
 from django.utils import timezone
 
-from django.db import transaction
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from rest_framework import serializers
 
-from books.serializers import BookSerializer
-from borrowings.models import Borrowing
-from borrowings.notifications.telegram import send_telegram_notification
+from books.cache import bump_catalog_version_on_commit
+from books.models import Book
+from books.serializers import BookSerializer, daily_fee_to_representation
+from borrowings.models import (
+    Borrowing,
+    BorrowerAccount,
+    BookCirculation,
+    BorrowingHistory,
+    DailyBorrowingStats,
+    Hold,
+    calculate_fine,
+)
+from borrowings.holds import release_copies
+from borrowings.notifications.outbox import enqueue_notification
+from library_service_api.fast_read import (
+    ValuesSerializer,
+    date_to_representation,
+)
+
+
+# Borrow and return paths take row locks in one order so they queue up
+# instead of deadlocking: borrowings, holds, books, book circulation,
+# borrower accounts, daily stats. Several rows of one table are locked in
+# id order.
 
 
 class BorrowingListSerializer(serializers.ModelSerializer):
@@ -38,6 +63,71 @@ class BorrowingDetailSerializer(serializers.ModelSerializer):
         )
 
 
+class BorrowingListValuesSerializer(ValuesSerializer):
+    """`BorrowingListSerializer` output built from `.values()` rows."""
+
+    values = (
+        "id",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "book__title",
+        "user",
+    )
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            "id": row["id"],
+            "borrow_date": date_to_representation(row["borrow_date"]),
+            "expected_return_date":
+                date_to_representation(row["expected_return_date"]),
+            "actual_return_date":
+                date_to_representation(row["actual_return_date"]),
+            "book_title": row["book__title"],
+            "user": row["user"],
+        }
+
+
+class BorrowingDetailValuesSerializer(ValuesSerializer):
+    """`BorrowingDetailSerializer` output built from `.values()` rows."""
+
+    values = (
+        "id",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+        "book__id",
+        "book__title",
+        "book__author",
+        "book__cover",
+        "book__inventory",
+        "book__daily_fee",
+        "user",
+    )
+
+    @classmethod
+    def to_representation(cls, row):
+        return {
+            "id": row["id"],
+            "borrow_date": date_to_representation(row["borrow_date"]),
+            "expected_return_date":
+                date_to_representation(row["expected_return_date"]),
+            "actual_return_date":
+                date_to_representation(row["actual_return_date"]),
+            "book": {
+                "id": row["book__id"],
+                "title": row["book__title"],
+                "author": row["book__author"],
+                "cover": row["book__cover"],
+                "inventory": row["book__inventory"],
+                "daily_fee":
+                    daily_fee_to_representation(row["book__daily_fee"]),
+            },
+            "user": row["user"],
+        }
+
+
 class BorrowingCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Borrowing
@@ -45,7 +135,9 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         data = super(BorrowingCreateSerializer, self).validate(attrs=attrs)
-        if attrs["book"].inventory <= 0:
+        if attrs["book"].inventory <= 0 and not self._ready_hold(
+            attrs["book"]
+        ).exists():
             raise serializers.ValidationError(
                 {
                     "book": "Book's inventory <= 0"
@@ -53,19 +145,56 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
             )
         return data
 
+    def _ready_hold(self, book):
+        return Hold.objects.filter(
+            book=book,
+            user_id=self.context["request"].user.id,
+            status=Hold.Status.READY,
+        )
+
     def create(self, validated_data):
         with transaction.atomic():
             book = validated_data["book"]
             user = self.context["request"].user
+            limit = settings.MAX_ACTIVE_BORROWINGS_PER_USER
 
-            book.inventory -= 1
-            book.save()
+            # A copy set aside for the user's hold is already out of stock
+            fulfilled = self._ready_hold(book).update(
+                status=Hold.Status.FULFILLED
+            )
+            if not fulfilled:
+                decremented = Book.objects.filter(
+                    pk=book.pk, inventory__gt=0
+                ).update(inventory=F("inventory") - 1)
+                if not decremented:
+                    raise serializers.ValidationError(
+                        {
+                            "book": "Book's inventory <= 0"
+                        }
+                    )
+                bump_catalog_version_on_commit()
+            BookCirculation.objects.add(
+                book.pk, active_borrowings=1, total_borrowings=1
+            )
+            within_limit = BorrowerAccount.objects.add(
+                user.id,
+                guard=Q(active_borrowings__lt=limit),
+                active_borrowings=1,
+            )
+            if not within_limit:
+                raise serializers.ValidationError(
+                    {
+                        "book": f"You can't have more than {limit} "
+                                f"active borrowings"
+                    }
+                )
 
             borrowing = Borrowing.objects.create(
-                user=user,
+                user_id=user.id,
                 book=book,
                 expected_return_date=validated_data["expected_return_date"],
             )
+            DailyBorrowingStats.objects.add(borrowing.borrow_date, borrowed=1)
 
             message = (
                 f"New Book Borrowing\n\n"
@@ -75,11 +204,128 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
                 f"Return By: {borrowing.expected_return_date}"
             )
 
-            send_telegram_notification(message=message)
+            enqueue_notification(message=message)
 
             return borrowing
 
 
+class BorrowingCheckoutSerializer(serializers.Serializer):
+    expected_return_date = serializers.DateField()
+    books = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BORROWING_CHECKOUT_MAX_BOOKS,
+    )
+
+    def validate_books(self, value):
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError(
+                "Each book can be borrowed once per checkout"
+            )
+        return value
+
+    def validate(self, attrs):
+        Borrowing(expected_return_date=attrs["expected_return_date"]).clean()
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Borrow every book in the cart or none. The user's ready holds and
+        then the books are locked in id order before the circulation and
+        account counters, the lock order every borrow and return path
+        follows, so a checkout queues up behind overlapping carts and
+        returns instead of deadlocking with them.
+        """
+        user = self.context["request"].user
+        book_ids = sorted(validated_data["books"])
+        limit = settings.MAX_ACTIVE_BORROWINGS_PER_USER
+
+        with transaction.atomic():
+            # Copies set aside for the user's holds are already out of stock
+            holds = dict(
+                Hold.objects
+                .select_for_update()
+                .filter(
+                    user_id=user.id,
+                    book_id__in=book_ids,
+                    status=Hold.Status.READY,
+                )
+                .order_by("id")
+                .values_list("id", "book_id")
+            )
+            Hold.objects.filter(id__in=holds).update(
+                status=Hold.Status.FULFILLED
+            )
+            held = set(holds.values())
+
+            books = list(
+                Book.objects
+                .select_for_update()
+                .filter(id__in=book_ids)
+                .order_by("id")
+            )
+            errors = {
+                book_id: "Book not found"
+                for book_id in set(book_ids) - {book.id for book in books}
+            }
+            for book in books:
+                if book.inventory <= 0 and book.id not in held:
+                    errors[book.id] = "Book's inventory <= 0"
+            if errors:
+                raise serializers.ValidationError({"books": errors})
+
+            taken = {
+                book_id: -1 for book_id in book_ids if book_id not in held
+            }
+            if taken:
+                Book.objects.adjust_inventory(taken)
+                bump_catalog_version_on_commit()
+            BookCirculation.objects.add_many(
+                {
+                    book_id: {"active_borrowings": 1, "total_borrowings": 1}
+                    for book_id in book_ids
+                }
+            )
+            within_limit = BorrowerAccount.objects.add(
+                user.id,
+                guard=Q(active_borrowings__lte=limit - len(book_ids)),
+                active_borrowings=len(book_ids),
+            )
+            if not within_limit:
+                raise serializers.ValidationError(
+                    {
+                        "books": f"You can't have more than {limit} "
+                                 f"active borrowings"
+                    }
+                )
+
+            borrowings = Borrowing.objects.bulk_create(
+                Borrowing(
+                    user_id=user.id,
+                    book=book,
+                    expected_return_date=validated_data[
+                        "expected_return_date"
+                    ],
+                )
+                for book in books
+            )
+            DailyBorrowingStats.objects.add(
+                borrowings[0].borrow_date, borrowed=len(borrowings)
+            )
+
+            message = (
+                f"New Book Borrowing\n\n"
+                f"User: {user.email}\n"
+                f"Books:\n"
+                + "".join(f"- {book.title}\n" for book in books)
+                + f"Borrowed On: {borrowings[0].borrow_date}\n"
+                f"Return By: {borrowings[0].expected_return_date}"
+            )
+            enqueue_notification(message=message)
+
+            return borrowings
+
+
 class BorrowingReturnSerializer(serializers.ModelSerializer):
     class Meta:
         model = Borrowing
@@ -99,12 +345,198 @@ class BorrowingReturnSerializer(serializers.ModelSerializer):
     def save(self, **kwargs):
         with transaction.atomic():
             borrowing = self.instance
-            book = borrowing.book
+            return_date = timezone.now().date()
 
-            borrowing.actual_return_date = timezone.now().date()
-            borrowing.save()
+            closed = Borrowing.objects.filter(
+                pk=borrowing.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=return_date)
+            if not closed:
+                raise serializers.ValidationError(
+                    {
+                        "actual_return_date":
+                            "This borrowing has already been returned"
+                    }
+                )
+            borrowing.actual_return_date = return_date
 
-            book.inventory += 1
-            book.save()
+            release_copies({borrowing.book_id: 1})
+            BookCirculation.objects.add(
+                borrowing.book_id, active_borrowings=-1
+            )
+            BorrowerAccount.objects.add(
+                borrowing.user_id,
+                active_borrowings=-1,
+                fines_balance=borrowing.fine_on(return_date),
+            )
+            DailyBorrowingStats.objects.add(
+                return_date,
+                returned=1,
+                loan_days=(return_date - borrowing.borrow_date).days,
+            )
+            borrowing.book.refresh_from_db(fields=["inventory"])
 
             return borrowing
+
+
+class BorrowingBulkReturnSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BORROWING_BULK_RETURN_MAX_SIZE,
+    )
+
+    def save(self, **kwargs):
+        """
+        Close every active borrowing in `ids` with set-based UPDATEs and
+        return a status per requested id.
+        """
+        ids = list(dict.fromkeys(self.validated_data["ids"]))
+        return_date = timezone.now().date()
+
+        with transaction.atomic():
+            active = list(
+                Borrowing.objects
+                .select_for_update(of=("self", ))
+                .filter(id__in=ids, actual_return_date__isnull=True)
+                .order_by("id")
+                .values(
+                    "id",
+                    "user_id",
+                    "book_id",
+                    "borrow_date",
+                    "expected_return_date",
+                    "book__daily_fee",
+                )
+            )
+            returned = {row["id"] for row in active}
+            missing = set(ids) - returned
+            if missing:
+                missing -= set(
+                    BorrowingHistory.objects
+                    .filter(id__in=missing)
+                    .values_list("id", flat=True)
+                )
+
+            if active:
+                self._close(active, return_date)
+
+        results = []
+        for borrowing_id in ids:
+            if borrowing_id in returned:
+                result = "returned"
+            elif borrowing_id in missing:
+                result = "not_found"
+            else:
+                result = "already_returned"
+            results.append({"id": borrowing_id, "status": result})
+        return results
+
+    @staticmethod
+    def _close(active, return_date):
+        Borrowing.objects.filter(id__in=[row["id"] for row in active]).update(
+            actual_return_date=return_date
+        )
+
+        books = Counter(row["book_id"] for row in active)
+        release_copies(books)
+        BookCirculation.objects.add_many(
+            {
+                book_id: {"active_borrowings": -count}
+                for book_id, count in books.items()
+            }
+        )
+
+        accounts = defaultdict(
+            lambda: {"active_borrowings": 0, "fines_balance": 0}
+        )
+        for row in active:
+            accounts[row["user_id"]]["active_borrowings"] -= 1
+            accounts[row["user_id"]]["fines_balance"] += calculate_fine(
+                row["expected_return_date"],
+                return_date,
+                row["book__daily_fee"],
+            )
+        BorrowerAccount.objects.add_many(accounts)
+
+        DailyBorrowingStats.objects.add(
+            return_date,
+            returned=len(active),
+            loan_days=sum(
+                (return_date - row["borrow_date"]).days for row in active
+            ),
+        )
+
+
+class BalanceSerializer(serializers.Serializer):
+    fines_balance = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
+    accruing_fines = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
+
+
+class DebtorSerializer(serializers.Serializer):
+    user = serializers.IntegerField(read_only=True)
+    email = serializers.EmailField(read_only=True)
+    fines_balance = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
+
+
+class DailyStatsSerializer(serializers.Serializer):
+    day = serializers.DateField(read_only=True)
+    borrowed = serializers.IntegerField(read_only=True)
+    returned = serializers.IntegerField(read_only=True)
+
+
+class PopularBookSerializer(serializers.Serializer):
+    book = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    borrowings = serializers.IntegerField(
+        source="total_borrowings", read_only=True
+    )
+
+
+class BorrowingStatsSerializer(serializers.Serializer):
+    days = DailyStatsSerializer(many=True, read_only=True)
+    average_loan_days = serializers.FloatField(
+        read_only=True, allow_null=True
+    )
+    top_books = PopularBookSerializer(many=True, read_only=True)
+
+
+class HoldSerializer(serializers.ModelSerializer):
+    book_title = serializers.CharField(source="book.title", read_only=True)
+    status = serializers.CharField(source="get_status_display", read_only=True)
+
+    class Meta:
+        model = Hold
+        fields = (
+            "id", "book", "book_title", "status", "created_at", "ready_at"
+        )
+        read_only_fields = ("created_at", "ready_at")
+
+    def validate_book(self, book):
+        if book.inventory > 0:
+            raise serializers.ValidationError(
+                "Book is available, borrow it instead"
+            )
+        user = self.context["request"].user
+        if Hold.objects.filter(
+            book=book, user_id=user.id, status__in=Hold.OPEN_STATUSES
+        ).exists():
+            raise serializers.ValidationError(
+                "You already have a hold on this book"
+            )
+        return book
+
+    def create(self, validated_data):
+        validated_data["user_id"] = self.context["request"].user.id
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"book": "You already have a hold on this book"}
+            )
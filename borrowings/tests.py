@@ -1,26 +1,58 @@
+import csv
+import io
+import json
 import os
+import threading
+from io import StringIO
+import unittest
 from datetime import date, timedelta
+from decimal import Decimal
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from books.models import Book
-from borrowings.models import Borrowing
+from borrowings.models import (
+    ArchivedBorrowing,
+    Borrowing,
+    BorrowerAccount,
+    BookCirculation,
+    DailyBorrowingStats,
+    Hold,
+    OutboxMessage,
+)
+from borrowings.notifications.outbox import drain_outbox, retry_delay
 from borrowings.notifications.telegram import (
     send_telegram_notification,
-    TELEGRAM_API_URL
+    TELEGRAM_API_URL,
+    TELEGRAM_TIMEOUT
 )
 from borrowings.serializers import (
     BorrowingListSerializer,
-    BorrowingDetailSerializer
+    BorrowingDetailSerializer,
+    BorrowingListValuesSerializer,
+    BorrowingDetailValuesSerializer,
 )
+from library_service_api.pagination import KeysetOrLimitOffsetPagination
 
 BORROWING_URL = reverse("borrowings:borrowing-list")
+EXPORT_URL = reverse("borrowings:borrowing-export")
+DEBTORS_URL = reverse("borrowings:borrowing-debtors")
+BULK_RETURN_URL = reverse("borrowings:borrowing-bulk-return")
+CHECKOUT_URL = reverse("borrowings:borrowing-checkout")
+HOLD_URL = reverse("borrowings:hold-list")
+STATS_URL = reverse("borrowings:borrowing-stats")
+BALANCE_URL = reverse("user:balance")
 
 
 def detail_url(borrowing_id):
@@ -29,7 +61,7 @@ def detail_url(borrowing_id):
 
 def return_url(borrowing_id):
     return reverse(
-        "borrowings:borrowing-return",
+        "borrowings:borrowing-return-borrowing",
         args=[borrowing_id]
     )
 
@@ -106,6 +138,19 @@ class AuthenticatedBorrowingApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
+    @patch("requests.post")
+    def test_create_borrowing_queues_notification(self, mock_post):
+        payload = {
+            "expected_return_date": date.today() + timedelta(days=2),
+            "book": self.book2.id,
+        }
+        self.client.post(BORROWING_URL, payload)
+
+        mock_post.assert_not_called()
+        outbox_message = OutboxMessage.objects.get()
+        self.assertIn(self.book2.title, outbox_message.message)
+        self.assertIsNone(outbox_message.sent_at)
+
     def test_filter_borrowings_by_is_active(self):
         res = self.client.get(BORROWING_URL, {"is_active": "true"})
 
@@ -162,6 +207,66 @@ class AdminBorrowingApiTests(TestCase):
         self.assertEqual(serializer.data, res.data["results"])
         self.assertEqual(len(res.data["results"]), 2)
 
+    def test_list_borrowings_with_cursor_pagination(self):
+        res = self.client.get(
+            BORROWING_URL,
+            {"cursor": "", "limit": 1, "user_id": self.non_admin_user.id}
+        )
+
+        self.assertEqual(
+            res.data["results"],
+            [BorrowingListSerializer(self.borrowing2).data]
+        )
+        self.assertIsNone(res.data["next"])
+        self.assertIsNone(res.data["previous"])
+
+        res = self.client.get(BORROWING_URL, {"cursor": "", "limit": 1})
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            res.data["results"],
+            [BorrowingListSerializer(self.borrowing1).data]
+        )
+        self.assertIsNone(res.data["next"])
+
+    def test_list_borrowings_with_malformed_cursor(self):
+        cursor = KeysetOrLimitOffsetPagination().encode_cursor(
+            ["not-a-date", 1]
+        )
+
+        res = self.client.get(BORROWING_URL, {"cursor": cursor})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_borrowings_as_ndjson(self):
+        res = self.client.get(
+            EXPORT_URL, {"user_id": self.non_admin_user.id}
+        )
+        rows = [
+            json.loads(line)
+            for line in b"".join(res.streaming_content).splitlines()
+        ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            rows, [BorrowingListSerializer(self.borrowing2).data]
+        )
+
+    def test_export_borrowings_as_csv(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "csv"})
+        rows = list(csv.reader(
+            b"".join(res.streaming_content).decode().splitlines()
+        ))
+
+        self.assertEqual(rows[0], list(BorrowingListSerializer().fields))
+        self.assertEqual(len(rows), 3)
+
+    def test_export_rejects_unknown_format(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_filter_borrowings_by_user_id(self):
         res = self.client.get(
             BORROWING_URL,
@@ -175,6 +280,1395 @@ class AdminBorrowingApiTests(TestCase):
         self.assertNotIn(serializer1.data, res.data["results"])
 
 
+class BorrowingValuesSerializerContractTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user("test@test.com")
+        book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=1,
+            daily_fee="0.50",
+        )
+        for days in (1, 2):
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=days),
+                book=book,
+                user=user,
+            )
+        Borrowing.objects.filter(
+            expected_return_date=date.today() + timedelta(days=1)
+        ).update(actual_return_date=date.today())
+
+    def assert_identical(self, serializer_class, values_serializer):
+        borrowings = Borrowing.objects.select_related("book").order_by("id")
+
+        expected = JSONRenderer().render(
+            serializer_class(borrowings, many=True).data
+        )
+        actual = JSONRenderer().render(
+            values_serializer.many(
+                borrowings.values(*values_serializer.values)
+            )
+        )
+
+        self.assertEqual(actual, expected)
+
+    def test_list_output_is_identical(self):
+        self.assert_identical(
+            BorrowingListSerializer, BorrowingListValuesSerializer
+        )
+
+    def test_detail_output_is_identical(self):
+        self.assert_identical(
+            BorrowingDetailSerializer, BorrowingDetailValuesSerializer
+        )
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Query plans are PostgreSQL specific"
+)
+class BorrowingQueryPlanTests(TestCase):
+    """
+    Every borrowing endpoint must reach borrowings_borrowing through an
+    index at realistic table sizes, including through the
+    borrowings_history view. The unfiltered limit/offset staff list
+    is left out: its COUNT(*) reads the whole table by design, which is
+    what ?cursor= pagination is for.
+    """
+
+    USERS = 200
+    BORROWINGS = 50_000
+    ACTIVE_EVERY = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_user(
+            "test_admin@admin.com", is_staff=True
+        )
+        cls.users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com")
+            for i in range(cls.USERS)
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"title{i}",
+                author=f"author{i}",
+                cover="HD",
+                inventory=1,
+                daily_fee=1,
+            )
+            for i in range(100)
+        )
+        Borrowing.objects.bulk_create(
+            (
+                Borrowing(
+                    expected_return_date=date.today() + timedelta(days=7),
+                    book=books[i % len(books)],
+                    user=cls.users[i % cls.USERS],
+                )
+                for i in range(cls.BORROWINGS)
+            ),
+            batch_size=5_000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE borrowings_borrowing "
+                "SET borrow_date = borrow_date - (id %% 1000)::int, "
+                "actual_return_date = CASE WHEN id %% %s = 0 THEN NULL "
+                "ELSE borrow_date END",
+                [cls.ACTIVE_EVERY],
+            )
+            cursor.execute("ANALYZE borrowings_borrowing")
+
+    def assert_no_seq_scan(self, user, params=None, url=BORROWING_URL):
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        selects = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and (
+                "borrowings_borrowing" in query["sql"]
+                or "borrowings_history" in query["sql"]
+            )
+        ]
+        self.assertTrue(selects)
+        with connection.cursor() as cursor:
+            for sql in selects:
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                self.assertNotIn(
+                    "Seq Scan on borrowings_borrowing", plan, msg=sql
+                )
+
+    def test_user_list(self):
+        self.assert_no_seq_scan(self.users[0])
+        self.assert_no_seq_scan(self.users[0], {"is_active": "true"})
+        self.assert_no_seq_scan(self.users[0], {"is_active": "false"})
+
+    def test_staff_list_filtered_by_user(self):
+        self.assert_no_seq_scan(self.admin_user, {"user_id": self.users[1].id})
+        self.assert_no_seq_scan(
+            self.admin_user,
+            {"user_id": self.users[1].id, "is_active": "true"}
+        )
+
+    def test_staff_list_active(self):
+        self.assert_no_seq_scan(self.admin_user, {"is_active": "true"})
+
+    def test_staff_list_with_cursor(self):
+        self.assert_no_seq_scan(self.admin_user, {"cursor": ""})
+        self.assert_no_seq_scan(
+            self.admin_user, {"cursor": "", "is_active": "false"}
+        )
+
+    def test_retrieve(self):
+        borrowing = Borrowing.objects.filter(user=self.users[2]).first()
+
+        self.assert_no_seq_scan(self.users[2], url=detail_url(borrowing.id))
+
+
+class ConcurrentInventoryTests(TransactionTestCase):
+    THREADS = 12
+
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=5,
+            daily_fee=12.23,
+        )
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@test.com")
+            for i in range(self.THREADS)
+        ]
+
+    def run_concurrently(self, requests):
+        barrier = threading.Barrier(len(requests))
+        responses = []
+
+        def worker(user, method, url, payload):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                barrier.wait()
+                responses.append(getattr(client, method)(url, payload))
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=request)
+            for request in requests
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return responses
+
+    def test_concurrent_checkouts_never_oversell(self):
+        payload = {
+            "expected_return_date": date.today() + timedelta(days=2),
+            "book": self.book.id,
+        }
+        responses = self.run_concurrently(
+            [(user, "post", BORROWING_URL, payload) for user in self.users]
+        )
+        self.book.refresh_from_db()
+
+        created = [
+            res for res in responses
+            if res.status_code == status.HTTP_201_CREATED
+        ]
+        self.assertEqual(len(created), 5)
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.count(), 5)
+
+    def test_overlapping_carts_never_oversell(self):
+        other_books = [
+            Book.objects.create(
+                title=f"test_title{i}",
+                author="test_author",
+                cover="HD",
+                inventory=self.THREADS,
+                daily_fee=1,
+            )
+            for i in range(2)
+        ]
+        carts = [
+            [self.book.id, other_books[0].id],
+            [other_books[1].id, self.book.id],
+            [other_books[1].id, other_books[0].id, self.book.id],
+        ]
+        responses = self.run_concurrently(
+            [
+                (
+                    user,
+                    "post",
+                    CHECKOUT_URL,
+                    {
+                        "expected_return_date":
+                            date.today() + timedelta(days=2),
+                        "books": carts[i % len(carts)],
+                    },
+                )
+                for i, user in enumerate(self.users)
+            ]
+        )
+
+        statuses = sorted(res.status_code for res in responses)
+        self.assertEqual(
+            statuses,
+            [status.HTTP_201_CREATED] * 5
+            + [status.HTTP_400_BAD_REQUEST] * (self.THREADS - 5),
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+        for book in other_books:
+            borrowed = Borrowing.objects.filter(book=book).count()
+            book.refresh_from_db()
+            self.assertEqual(book.inventory, self.THREADS - borrowed)
+
+    def test_simultaneous_returns_allocate_each_hold_once(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=0)
+        borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=2),
+                book=self.book,
+                user=user,
+            )
+            for user in self.users[:6]
+        ]
+        for user in self.users[6:10]:
+            Hold.objects.create(book=self.book, user=user)
+
+        self.run_concurrently(
+            [
+                (borrowing.user, "post", return_url(borrowing.id), {})
+                for borrowing in borrowings
+            ]
+        )
+        self.book.refresh_from_db()
+
+        self.assertEqual(
+            list(Hold.objects.values_list("status", flat=True)),
+            [Hold.Status.READY] * 4,
+        )
+        self.assertEqual(self.book.inventory, 2)
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                message__startswith="Hold Ready"
+            ).count(),
+            4,
+        )
+
+    @override_settings(MAX_ACTIVE_BORROWINGS_PER_USER=3)
+    def test_concurrent_checkouts_respect_borrow_limit(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=self.THREADS)
+        payload = {
+            "expected_return_date": date.today() + timedelta(days=2),
+            "book": self.book.id,
+        }
+        responses = self.run_concurrently(
+            [(self.users[0], "post", BORROWING_URL, payload)] * self.THREADS
+        )
+
+        created = [
+            res for res in responses
+            if res.status_code == status.HTTP_201_CREATED
+        ]
+        self.assertEqual(len(created), 3)
+        self.assertEqual(Borrowing.objects.count(), 3)
+        self.assertEqual(
+            BorrowerAccount.objects.get(user=self.users[0]).active_borrowings,
+            3,
+        )
+
+    def test_concurrent_returns_restore_inventory_once(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=0)
+        borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=2),
+                book=self.book,
+                user=user,
+            )
+            for user in self.users[:6]
+        ]
+        responses = self.run_concurrently(
+            [
+                (borrowing.user, "post", return_url(borrowing.id), {})
+                for borrowing in borrowings
+                for _ in range(2)
+            ]
+        )
+        self.book.refresh_from_db()
+
+        returned = [
+            res for res in responses if res.status_code == status.HTTP_200_OK
+        ]
+        self.assertEqual(len(returned), 6)
+        self.assertEqual(self.book.inventory, 6)
+
+    def test_mixed_borrows_and_returns_of_one_book(self):
+        borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=2),
+                book=self.book,
+                user=user,
+            )
+            for user in self.users[:6]
+        ]
+        call_command("reconcile_counters", stdout=Mock())
+        payload = {
+            "expected_return_date": date.today() + timedelta(days=2),
+            "book": self.book.id,
+        }
+        responses = self.run_concurrently(
+            [
+                (borrowing.user, "post", return_url(borrowing.id), {})
+                for borrowing in borrowings
+            ]
+            + [
+                (user, "post", BORROWING_URL, payload)
+                for user in self.users[6:]
+            ]
+        )
+        self.book.refresh_from_db()
+
+        self.assertEqual(
+            sorted(res.status_code for res in responses)[:6],
+            [status.HTTP_200_OK] * 6,
+        )
+        self.assertTrue(all(res.status_code < 500 for res in responses))
+        active = Borrowing.objects.filter(actual_return_date__isnull=True)
+        self.assertEqual(self.book.inventory, 5 + 6 - active.count())
+        self.assertEqual(
+            BookCirculation.objects.get(book=self.book).active_borrowings,
+            active.count(),
+        )
+
+    def test_overlapping_checkout_and_bulk_return(self):
+        other_book = Book.objects.create(
+            title="test_title2",
+            author="test_author2",
+            cover="HD",
+            inventory=5,
+            daily_fee=1,
+        )
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", is_staff=True
+        )
+        borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=2),
+                book=book,
+                user=user,
+            )
+            for user in self.users[:4]
+            for book in (self.book, other_book)
+        ]
+        call_command("reconcile_counters", stdout=Mock())
+        cart = {
+            "expected_return_date": date.today() + timedelta(days=2),
+            "books": [other_book.id, self.book.id],
+        }
+        responses = self.run_concurrently(
+            [
+                (
+                    admin,
+                    "post",
+                    BULK_RETURN_URL,
+                    {"ids": [borrowing.id for borrowing in borrowings]},
+                ),
+            ]
+            + [(user, "post", CHECKOUT_URL, cart) for user in self.users]
+        )
+
+        self.assertTrue(all(res.status_code < 500 for res in responses))
+        active = Borrowing.objects.filter(actual_return_date__isnull=True)
+        for book in (self.book, other_book):
+            book.refresh_from_db()
+            self.assertEqual(
+                book.inventory, 5 + 4 - active.filter(book=book).count()
+            )
+        for user in self.users:
+            account = BorrowerAccount.objects.filter(user=user).first()
+            self.assertEqual(
+                account.active_borrowings if account else 0,
+                active.filter(user=user).count(),
+            )
+
+    def test_overlapping_bulk_returns(self):
+        books = [self.book] + [
+            Book.objects.create(
+                title=f"test_title{i}",
+                author="test_author",
+                cover="HD",
+                inventory=0,
+                daily_fee=1,
+            )
+            for i in range(2, 5)
+        ]
+        admin = get_user_model().objects.create_user(
+            "admin@test.com", is_staff=True
+        )
+        borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=2),
+                book=book,
+                user=user,
+            )
+            for user in self.users[:6]
+            for book in books
+        ]
+        call_command("reconcile_counters", stdout=Mock())
+        ids = [borrowing.id for borrowing in borrowings]
+        responses = self.run_concurrently(
+            [
+                (admin, "post", BULK_RETURN_URL, {"ids": ids[::step]})
+                for step in (1, -1, 2, -2)
+            ]
+        )
+
+        self.assertEqual(
+            [res.status_code for res in responses], [status.HTTP_200_OK] * 4
+        )
+        self.assertFalse(
+            BookCirculation.objects.exclude(active_borrowings=0).exists()
+        )
+        self.assertFalse(
+            BorrowerAccount.objects.exclude(active_borrowings=0).exists()
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 5 + 6)
+
+
+class OverdueReminderTests(TestCase):
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@test.com")
+            for i in range(3)
+        ]
+        book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=10,
+            daily_fee=12.23,
+        )
+        for user, count in zip(self.users, (3, 1, 2)):
+            for _ in range(count):
+                Borrowing.objects.create(
+                    expected_return_date=date.today() + timedelta(days=1),
+                    book=book,
+                    user=user,
+                )
+        Borrowing.objects.update(
+            expected_return_date=date.today() - timedelta(days=1)
+        )
+        Borrowing.objects.filter(user=self.users[1]).update(
+            actual_return_date=date.today()
+        )
+
+    def test_one_reminder_per_user_with_overdue_borrowings(self):
+        call_command("send_overdue_reminders", batch_size=2, stdout=Mock())
+
+        messages = list(
+            OutboxMessage.objects.values_list("message", flat=True)
+        )
+        self.assertEqual(len(messages), 2)
+        self.assertIn(self.users[0].email, messages[0])
+        self.assertIn("Overdue books: 3", messages[0])
+        self.assertIn(self.users[2].email, messages[1])
+        self.assertIn("Overdue books: 2", messages[1])
+
+
+class FineTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com")
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=10,
+            daily_fee=Decimal("1.50"),
+        )
+
+    def borrow(self, user, days_overdue):
+        borrowing = Borrowing.objects.create(
+            expected_return_date=date.today() + timedelta(days=1),
+            book=self.book,
+            user=user,
+        )
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            expected_return_date=date.today() - timedelta(days=days_overdue)
+        )
+        borrowing.refresh_from_db()
+        return borrowing
+
+    def test_fines_annotated_in_the_database(self):
+        self.borrow(self.user, 4)
+        self.borrow(self.user, -2)
+        returned = self.borrow(self.user, 3)
+        Borrowing.objects.filter(pk=returned.pk).update(
+            actual_return_date=date.today() - timedelta(days=1)
+        )
+
+        fines = sorted(
+            Borrowing.objects.with_fines().values_list("fine", flat=True)
+        )
+
+        self.assertEqual(
+            fines, [Decimal("0.00"), Decimal("3.00"), Decimal("6.00")]
+        )
+
+    def test_return_charges_fine_to_balance(self):
+        self.client.post(return_url(self.borrow(self.user, 2).id))
+        self.client.post(return_url(self.borrow(self.user, 1).id))
+        self.client.post(return_url(self.borrow(self.user, -1).id))
+        self.borrow(self.user, 5)
+
+        res = self.client.get(BALANCE_URL)
+
+        self.assertEqual(
+            res.data,
+            {"fines_balance": "4.50", "accruing_fines": "7.50"},
+        )
+
+    def test_balance_without_borrowings(self):
+        res = self.client.get(BALANCE_URL)
+
+        self.assertEqual(
+            res.data,
+            {"fines_balance": "0.00", "accruing_fines": "0.00"},
+        )
+
+    def test_top_debtors_single_query(self):
+        users = [
+            get_user_model().objects.create_user(f"user{i}@test.com")
+            for i in range(3)
+        ]
+        for user, fine in zip(users, ("5.00", "0.00", "9.00")):
+            BorrowerAccount.objects.add(user.id, fines_balance=Decimal(fine))
+        self.user.is_staff = True
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(DEBTORS_URL, {"limit": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["email"], row["fines_balance"]) for row in res.data],
+            [("user2@test.com", "9.00"), ("user0@test.com", "5.00")],
+        )
+
+    def test_top_debtors_staff_only(self):
+        res = self.client.get(DEBTORS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_recalculate_fines_corrects_drift(self):
+        other = get_user_model().objects.create_user("other@test.com")
+        self.client.post(return_url(self.borrow(self.user, 2).id))
+        Borrowing.objects.filter(
+            pk=self.borrow(other, 4).pk
+        ).update(actual_return_date=date.today())
+        BorrowerAccount.objects.filter(user=self.user).update(
+            fines_balance=Decimal("100")
+        )
+
+        call_command("recalculate_fines", stdout=Mock())
+
+        self.assertEqual(
+            dict(
+                BorrowerAccount.objects.values_list("user", "fines_balance")
+            ),
+            {self.user.id: Decimal("3.00"), other.id: Decimal("6.00")},
+        )
+
+
+class ActiveBorrowingCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com")
+        self.client.force_authenticate(self.user)
+        self.books = [
+            Book.objects.create(
+                title=f"test_title{i}",
+                author="test_author",
+                cover="HD",
+                inventory=10,
+                daily_fee=1,
+            )
+            for i in range(3)
+        ]
+
+    def borrow(self, book):
+        return self.client.post(
+            BORROWING_URL,
+            {
+                "expected_return_date": date.today() + timedelta(days=2),
+                "book": book.id,
+            },
+        )
+
+    def counters(self):
+        return (
+            BorrowerAccount.objects.get(user=self.user).active_borrowings,
+            dict(
+                BookCirculation.objects.values_list(
+                    "book", "active_borrowings"
+                )
+            ),
+        )
+
+    def test_counters_follow_borrow_and_return(self):
+        first = self.borrow(self.books[0]).data["id"]
+        self.borrow(self.books[0])
+        self.borrow(self.books[1])
+        self.client.post(return_url(first))
+
+        self.assertEqual(
+            self.counters(),
+            (2, {self.books[0].id: 1, self.books[1].id: 1}),
+        )
+
+    @override_settings(MAX_ACTIVE_BORROWINGS_PER_USER=2)
+    def test_borrow_limit(self):
+        self.borrow(self.books[0])
+        self.borrow(self.books[1])
+
+        res = self.borrow(self.books[2])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Borrowing.objects.count(), 2)
+        self.books[2].refresh_from_db()
+        self.assertEqual(self.books[2].inventory, 10)
+        self.assertEqual(self.counters()[0], 2)
+
+    @override_settings(MAX_ACTIVE_BORROWINGS_PER_USER=2)
+    def test_return_frees_a_slot(self):
+        first = self.borrow(self.books[0]).data["id"]
+        self.borrow(self.books[1])
+        self.client.post(return_url(first))
+
+        res = self.borrow(self.books[2])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_reconcile_counters(self):
+        self.borrow(self.books[0])
+        self.borrow(self.books[1])
+        Borrowing.objects.create(
+            expected_return_date=date.today() + timedelta(days=2),
+            book=self.books[2],
+            user=self.user,
+        )
+        BookCirculation.objects.filter(book=self.books[0]).update(
+            active_borrowings=7
+        )
+
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+
+        self.assertEqual(
+            self.counters(),
+            (
+                3,
+                {
+                    self.books[0].id: 1,
+                    self.books[1].id: 1,
+                    self.books[2].id: 1,
+                },
+            ),
+        )
+        self.assertIn(
+            "borrower accounts: corrected 1 counters", out.getvalue()
+        )
+        self.assertIn(
+            "book circulations: corrected 2 counters", out.getvalue()
+        )
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com")
+        self.client.force_authenticate(self.user)
+        self.books = [
+            Book.objects.create(
+                title=f"test_title{i}",
+                author="test_author",
+                cover="HD",
+                inventory=2,
+                daily_fee=1,
+            )
+            for i in range(3)
+        ]
+
+    def checkout(self, books, days=2):
+        return self.client.post(
+            CHECKOUT_URL,
+            {
+                "expected_return_date": date.today() + timedelta(days=days),
+                "books": [book.id for book in books],
+            },
+            format="json",
+        )
+
+    def test_checkout_borrows_every_book(self):
+        res = self.checkout(self.books)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [row["book_title"] for row in res.data],
+            [book.title for book in self.books],
+        )
+        self.assertEqual(
+            set(Book.objects.values_list("inventory", flat=True)), {1}
+        )
+        self.assertEqual(
+            BorrowerAccount.objects.get(user=self.user).active_borrowings, 3
+        )
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        message = OutboxMessage.objects.get().message
+        for book in self.books:
+            self.assertIn(book.title, message)
+
+    def test_checkout_is_all_or_nothing(self):
+        Book.objects.filter(pk=self.books[1].pk).update(inventory=0)
+
+        res = self.checkout(self.books)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.json(),
+            {"books": {str(self.books[1].id): "Book's inventory <= 0"}},
+        )
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(
+            Book.objects.get(pk=self.books[0].pk).inventory, 2
+        )
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_checkout_rejects_duplicates_and_past_dates(self):
+        self.assertEqual(
+            self.checkout([self.books[0]] * 2).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.checkout(self.books, days=0).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertFalse(Borrowing.objects.exists())
+
+    @override_settings(MAX_ACTIVE_BORROWINGS_PER_USER=2)
+    def test_checkout_respects_borrow_limit(self):
+        res = self.checkout(self.books)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Borrowing.objects.exists())
+
+
+class HoldTests(TestCase):
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@test.com")
+            for i in range(3)
+        ]
+        self.clients = []
+        for user in self.users:
+            client = APIClient()
+            client.force_authenticate(user)
+            self.clients.append(client)
+        self.book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=1,
+            daily_fee=1,
+        )
+        self.borrowing_id = self.borrow(self.clients[0]).data["id"]
+
+    def borrow(self, client):
+        return client.post(
+            BORROWING_URL,
+            {
+                "expected_return_date": date.today() + timedelta(days=2),
+                "book": self.book.id,
+            },
+        )
+
+    def place_hold(self, client):
+        return client.post(HOLD_URL, {"book": self.book.id})
+
+    def test_hold_only_for_out_of_stock_books(self):
+        self.clients[0].post(return_url(self.borrowing_id))
+
+        res = self.place_hold(self.clients[1])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_one_open_hold_per_book(self):
+        self.assertEqual(
+            self.place_hold(self.clients[1]).status_code,
+            status.HTTP_201_CREATED,
+        )
+        self.assertEqual(
+            self.place_hold(self.clients[1]).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_return_goes_to_head_of_queue(self):
+        first = self.place_hold(self.clients[1]).data["id"]
+        second = self.place_hold(self.clients[2]).data["id"]
+
+        self.clients[0].post(return_url(self.borrowing_id))
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(
+            dict(Hold.objects.values_list("id", "status")),
+            {first: Hold.Status.READY, second: Hold.Status.WAITING},
+        )
+        self.assertIn(
+            self.users[1].email, OutboxMessage.objects.last().message
+        )
+
+        self.assertEqual(
+            self.borrow(self.clients[2]).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.borrow(self.clients[1]).status_code,
+            status.HTTP_201_CREATED,
+        )
+        self.assertEqual(
+            Hold.objects.get(id=first).status, Hold.Status.FULFILLED
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def checkout(self, client):
+        return client.post(
+            CHECKOUT_URL,
+            {
+                "expected_return_date": date.today() + timedelta(days=2),
+                "books": [self.book.id],
+            },
+            format="json",
+        )
+
+    def test_checkout_fulfils_ready_hold(self):
+        hold = self.place_hold(self.clients[1]).data["id"]
+        self.clients[0].post(return_url(self.borrowing_id))
+
+        res = self.checkout(self.clients[1])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Hold.objects.get(id=hold).status, Hold.Status.FULFILLED
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_checkout_takes_held_copy_before_shelf_copy(self):
+        self.place_hold(self.clients[1])
+        self.clients[0].post(return_url(self.borrowing_id))
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+
+        self.assertEqual(
+            self.checkout(self.clients[1]).status_code,
+            status.HTTP_201_CREATED,
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_cancelled_ready_hold_passes_copy_on(self):
+        first = self.place_hold(self.clients[1]).data["id"]
+        second = self.place_hold(self.clients[2]).data["id"]
+        self.clients[0].post(return_url(self.borrowing_id))
+
+        res = self.clients[1].delete(
+            reverse("borrowings:hold-detail", args=[first])
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            dict(Hold.objects.values_list("id", "status")),
+            {first: Hold.Status.CANCELLED, second: Hold.Status.READY},
+        )
+
+    def test_bulk_return_allocates_holds(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+        self.borrow(self.clients[1])
+        self.place_hold(self.clients[2])
+        admin_client = APIClient()
+        admin_client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", is_staff=True
+            )
+        )
+
+        admin_client.post(
+            BULK_RETURN_URL,
+            {"ids": list(Borrowing.objects.values_list("id", flat=True))},
+            format="json",
+        )
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+        self.assertEqual(Hold.objects.get().status, Hold.Status.READY)
+
+    def admin_client(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", is_staff=True
+            )
+        )
+        return client
+
+    @override_settings(HOLD_READY_DAYS=3)
+    def test_expired_ready_hold_passes_copy_on(self):
+        first = self.place_hold(self.clients[1]).data["id"]
+        second = self.place_hold(self.clients[2]).data["id"]
+        self.clients[0].post(return_url(self.borrowing_id))
+
+        call_command("expire_holds", stdout=Mock())
+        self.assertEqual(
+            Hold.objects.get(id=first).status, Hold.Status.READY
+        )
+
+        Hold.objects.filter(id=first).update(
+            ready_at=timezone.now() - timedelta(days=4)
+        )
+        call_command("expire_holds", stdout=Mock())
+
+        self.assertEqual(
+            dict(Hold.objects.values_list("id", "status")),
+            {first: Hold.Status.EXPIRED, second: Hold.Status.READY},
+        )
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_inventory_batch_restock_goes_to_holds(self):
+        hold = self.place_hold(self.clients[1]).data["id"]
+
+        res = self.admin_client().post(
+            reverse("books:book-adjust-inventory"),
+            {"adjustments": [{"id": self.book.id, "delta": 2}]},
+            format="json",
+        )
+
+        self.assertEqual(res.data, [{"id": self.book.id, "inventory": 1}])
+        self.assertEqual(Hold.objects.get(id=hold).status, Hold.Status.READY)
+
+    def test_book_update_restock_goes_to_holds(self):
+        hold = self.place_hold(self.clients[1]).data["id"]
+
+        res = self.admin_client().patch(
+            reverse("books:book-detail", args=[self.book.id]),
+            {"inventory": 1},
+        )
+
+        self.assertEqual(res.data["inventory"], 0)
+        self.assertEqual(Hold.objects.get(id=hold).status, Hold.Status.READY)
+
+
+class BulkReturnTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            "admin@test.com", is_staff=True
+        )
+        self.client.force_authenticate(self.admin_user)
+        self.users = [
+            get_user_model().objects.create_user(f"user{i}@test.com")
+            for i in range(2)
+        ]
+        self.books = [
+            Book.objects.create(
+                title=f"test_title{i}",
+                author="test_author",
+                cover="HD",
+                inventory=10,
+                daily_fee=Decimal("2.00"),
+            )
+            for i in range(2)
+        ]
+
+    def borrow(self, user, book, count=1):
+        client = APIClient()
+        client.force_authenticate(user)
+        return [
+            client.post(
+                BORROWING_URL,
+                {
+                    "expected_return_date": date.today() + timedelta(days=2),
+                    "book": book.id,
+                },
+            ).data["id"]
+            for _ in range(count)
+        ]
+
+    def test_bulk_return(self):
+        first = self.borrow(self.users[0], self.books[0], 2)
+        second = self.borrow(self.users[1], self.books[0])
+        third = self.borrow(self.users[1], self.books[1])
+        Borrowing.objects.filter(id__in=first).update(
+            expected_return_date=date.today() - timedelta(days=3)
+        )
+        self.client.post(return_url(third[0]))
+        ids = first + second + third + [9999]
+
+        res = self.client.post(BULK_RETURN_URL, {"ids": ids}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                {"id": first[0], "status": "returned"},
+                {"id": first[1], "status": "returned"},
+                {"id": second[0], "status": "returned"},
+                {"id": third[0], "status": "already_returned"},
+                {"id": 9999, "status": "not_found"},
+            ],
+        )
+        self.assertFalse(
+            Borrowing.objects.filter(actual_return_date__isnull=True).exists()
+        )
+        self.assertEqual(
+            dict(Book.objects.values_list("id", "inventory")),
+            {self.books[0].id: 10, self.books[1].id: 10},
+        )
+        self.assertEqual(
+            set(BookCirculation.objects.values_list("active_borrowings")),
+            {(0, )},
+        )
+        self.assertEqual(
+            dict(
+                BorrowerAccount.objects.values_list("user", "fines_balance")
+            ),
+            {self.users[0].id: Decimal("12.00"), self.users[1].id: 0},
+        )
+
+    @override_settings(BORROWING_STATS_SHARDS=1)
+    def test_query_count_does_not_grow_with_batch(self):
+        with self.settings(MAX_ACTIVE_BORROWINGS_PER_USER=100):
+            small = self.borrow(self.users[0], self.books[0], 2)
+            large = self.borrow(self.users[1], self.books[1], 10)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.client.post(BULK_RETURN_URL, {"ids": small}, format="json")
+        with CaptureQueriesContext(connection) as large_queries:
+            self.client.post(BULK_RETURN_URL, {"ids": large}, format="json")
+
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertLessEqual(len(large_queries), 12)
+
+    def test_bulk_return_staff_only(self):
+        self.client.force_authenticate(self.users[0])
+
+        res = self.client.post(BULK_RETURN_URL, {"ids": [1]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BorrowingArchiveTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com")
+        self.client.force_authenticate(self.user)
+        book = Book.objects.create(
+            title="test_title1",
+            author="test_author1",
+            cover="HD",
+            inventory=10,
+            daily_fee=Decimal("1.00"),
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                expected_return_date=date.today() + timedelta(days=7),
+                book=book,
+                user=self.user,
+            )
+            for _ in range(4)
+        ]
+        old, self.recent = self.borrowings[:2], self.borrowings[2]
+        for borrowing in old:
+            Borrowing.objects.filter(pk=borrowing.pk).update(
+                borrow_date=date.today() - timedelta(days=800),
+                expected_return_date=date.today() - timedelta(days=795),
+                actual_return_date=date.today() - timedelta(days=790),
+            )
+        Borrowing.objects.filter(pk=self.recent.pk).update(
+            actual_return_date=date.today()
+        )
+        self.old_ids = [borrowing.id for borrowing in old]
+
+        call_command("archive_borrowings", stdout=Mock())
+
+    def test_old_returned_borrowings_move_to_archive(self):
+        self.assertEqual(
+            sorted(ArchivedBorrowing.objects.values_list("id", flat=True)),
+            self.old_ids,
+        )
+        self.assertEqual(
+            sorted(Borrowing.objects.values_list("id", flat=True)),
+            [borrowing.id for borrowing in self.borrowings[2:]],
+        )
+
+    def test_history_reads_include_archive(self):
+        returned = self.client.get(BORROWING_URL, {"is_active": "false"})
+        with_cursor = self.client.get(
+            BORROWING_URL, {"is_active": "false", "cursor": "", "limit": 2}
+        )
+        archived = self.client.get(detail_url(self.old_ids[0]))
+
+        self.assertEqual(
+            sorted(row["id"] for row in returned.data["results"]),
+            [*self.old_ids, self.recent.id],
+        )
+        self.assertEqual(
+            [row["id"] for row in with_cursor.data["results"]],
+            [self.recent.id, self.old_ids[1]],
+        )
+        self.assertEqual(archived.status_code, status.HTTP_200_OK)
+        self.assertEqual(archived.data["book"]["title"], "test_title1")
+
+    @override_settings(FAST_READ_SERIALIZERS=True)
+    def test_history_reads_with_fast_serializers(self):
+        res = self.client.get(BORROWING_URL, {"is_active": "false"})
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertEqual(
+            self.client.get(detail_url(self.old_ids[0])).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_active_reads_only_touch_hot_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(BORROWING_URL, {"is_active": "true"})
+
+        self.assertEqual(res.data["count"], 1)
+        for query in queries.captured_queries:
+            self.assertNotIn("borrowings_history", query["sql"])
+            self.assertNotIn("borrowings_archivedborrowing", query["sql"])
+
+    def test_recalculate_fines_includes_archive(self):
+        call_command("recalculate_fines", stdout=Mock())
+
+        self.assertEqual(
+            BorrowerAccount.objects.get(user=self.user).fines_balance,
+            Decimal("10.00"),
+        )
+
+
+class BorrowingStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@test.com", is_staff=True
+            )
+        )
+        self.books = [
+            Book.objects.create(
+                title=f"test_title{i}",
+                author="test_author",
+                cover="HD",
+                inventory=10,
+                daily_fee=1,
+            )
+            for i in range(2)
+        ]
+        user = get_user_model().objects.create_user("test@test.com")
+        patron = APIClient()
+        patron.force_authenticate(user)
+        ids = [
+            patron.post(
+                BORROWING_URL,
+                {
+                    "expected_return_date": date.today() + timedelta(days=7),
+                    "book": book.id,
+                },
+            ).data["id"]
+            for book in (self.books[1], self.books[0], self.books[1])
+        ]
+        Borrowing.objects.filter(id=ids[0]).update(
+            borrow_date=date.today() - timedelta(days=4)
+        )
+        patron.post(return_url(ids[0]))
+
+    def test_stats_from_rollups(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(STATS_URL, {"days": 7})
+
+        self.assertEqual(
+            res.json(),
+            {
+                "days": [
+                    {
+                        "day": date.today().isoformat(),
+                        "borrowed": 3,
+                        "returned": 1,
+                    }
+                ],
+                "average_loan_days": 4.0,
+                "top_books": [
+                    {
+                        "book": self.books[1].id,
+                        "title": "test_title1",
+                        "borrowings": 2,
+                    },
+                    {
+                        "book": self.books[0].id,
+                        "title": "test_title0",
+                        "borrowings": 1,
+                    },
+                ],
+            },
+        )
+
+    def test_rebuild_from_history(self):
+        incremental = self.client.get(STATS_URL).json()
+        DailyBorrowingStats.objects.all().delete()
+        BookCirculation.objects.update(total_borrowings=0)
+
+        call_command("rebuild_borrowing_stats", stdout=Mock())
+
+        rebuilt = self.client.get(STATS_URL).json()
+        # The history dates the first borrowing 4 days back
+        self.assertEqual(
+            rebuilt["days"],
+            [
+                {
+                    "day": (date.today() - timedelta(days=4)).isoformat(),
+                    "borrowed": 1,
+                    "returned": 0,
+                },
+                {
+                    "day": date.today().isoformat(),
+                    "borrowed": 2,
+                    "returned": 1,
+                },
+            ],
+        )
+        self.assertEqual(rebuilt["average_loan_days"], 4.0)
+        self.assertEqual(rebuilt["top_books"], incremental["top_books"])
+
+    def test_rebuild_corrects_drifted_rollups(self):
+        DailyBorrowingStats.objects.add(
+            date.today() - timedelta(days=10), borrowed=5
+        )
+        BookCirculation.objects.add(self.books[0].id, total_borrowings=3)
+        out = io.StringIO()
+
+        call_command("rebuild_borrowing_stats", stdout=out)
+        call_command("rebuild_borrowing_stats", stdout=out)
+
+        rebuilt = self.client.get(STATS_URL, {"days": 30}).json()
+        self.assertEqual(
+            [(row["day"], row["borrowed"]) for row in rebuilt["days"]],
+            [
+                ((date.today() - timedelta(days=4)).isoformat(), 1),
+                (date.today().isoformat(), 2),
+            ],
+        )
+        self.assertEqual(
+            [row["borrowings"] for row in rebuilt["top_books"]], [2, 1]
+        )
+        self.assertIn("corrected 3 days and 1 books", out.getvalue())
+        self.assertIn("corrected 0 days and 0 books", out.getvalue())
+
+    def test_stats_staff_only(self):
+        self.client.force_authenticate(
+            get_user_model().objects.get(email="test@test.com")
+        )
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BorrowingAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                "admin@test.com", is_staff=True, is_superuser=True
+            )
+        )
+
+    def create_borrowings(self, count, start=0):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com")
+            for i in range(start, start + count)
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"title{i}",
+                author="author",
+                cover="HD",
+                inventory=1,
+                daily_fee=1,
+            )
+            for i in range(start, start + count)
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=date.today() + timedelta(days=7),
+                book=book,
+                user=user,
+            )
+            for book, user in zip(books, users)
+        )
+
+    def changelist_queries(self, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                reverse("admin:borrowings_borrowing_changelist"), params
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self.create_borrowings(2)
+        few = self.changelist_queries()
+        few_active = self.changelist_queries({"is_active": "true"})
+        self.create_borrowings(50, start=2)
+
+        self.assertEqual(self.changelist_queries(), few)
+        self.assertEqual(
+            self.changelist_queries({"is_active": "true"}), few_active
+        )
+        self.assertLessEqual(few, 6)
+
+    def test_change_form_does_not_list_every_user_and_book(self):
+        self.create_borrowings(20)
+        borrowing = Borrowing.objects.get(user__email="user0@test.com")
+
+        res = self.client.get(
+            reverse(
+                "admin:borrowings_borrowing_change", args=[borrowing.id]
+            )
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertContains(res, "user0@test.com")
+        self.assertNotContains(res, "user1@test.com")
+        self.assertNotContains(res, "title1,")
+
+
 class TelegramSendingNotificationTests(TestCase):
     @patch.dict(os.environ,
                 {"TELEGRAM_BOT_TOKEN": "TEST_BOT_TOKEN",
@@ -200,7 +1694,63 @@ class TelegramSendingNotificationTests(TestCase):
 
         mock_post.assert_called_with(
             TELEGRAM_API_URL,
-            data=expected_payload
+            data=expected_payload,
+            timeout=TELEGRAM_TIMEOUT
         )
 
         self.assertEqual(mock_response.status_code, status.HTTP_200_OK)
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.messages = [
+            OutboxMessage.objects.create(message=f"message {i}")
+            for i in range(3)
+        ]
+
+    @patch("borrowings.notifications.telegram.send_telegram_notification")
+    def test_drain_sends_pending_messages_in_batches(self, mock_send):
+        self.assertEqual(drain_outbox(batch_size=2), (2, 0))
+        self.assertEqual(drain_outbox(batch_size=2), (1, 0))
+        self.assertEqual(drain_outbox(batch_size=2), (0, 0))
+
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertFalse(
+            OutboxMessage.objects.filter(sent_at__isnull=True).exists()
+        )
+
+    @patch(
+        "borrowings.notifications.telegram.send_telegram_notification",
+        side_effect=ValueError("Telegram is down"),
+    )
+    def test_drain_retries_failed_messages_with_backoff(self, mock_send):
+        self.assertEqual(drain_outbox(), (0, 3))
+        self.assertEqual(drain_outbox(), (0, 0))
+
+        for _ in range(10):
+            OutboxMessage.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(drain_outbox(), (0, 3))
+
+        self.assertEqual(mock_send.call_count, 3 * 11)
+        for outbox_message in OutboxMessage.objects.all():
+            self.assertIsNone(outbox_message.sent_at)
+            self.assertEqual(outbox_message.attempts, 11)
+            self.assertEqual(outbox_message.last_error, "Telegram is down")
+            self.assertGreater(
+                outbox_message.next_attempt_at,
+                timezone.now() + retry_delay(11) - timedelta(minutes=1),
+            )
+
+    def test_claimed_messages_are_leased_while_sending(self):
+        def send(message):
+            self.assertFalse(
+                OutboxMessage.objects.filter(
+                    next_attempt_at__lte=timezone.now()
+                ).exists()
+            )
+
+        with patch(
+            "borrowings.notifications.telegram.send_telegram_notification",
+            side_effect=send,
+        ):
+            self.assertEqual(drain_outbox(), (3, 0))
@@ -1,11 +1,12 @@
 from django.urls import path, include
 from rest_framework import routers
 
-from borrowings.views import BorrowingViewSet
+from borrowings.views import BorrowingViewSet, HoldViewSet
 
 
 router = routers.DefaultRouter()
 router.register("borrowings", BorrowingViewSet)
+router.register("holds", HoldViewSet)
 
 
 urlpatterns = [
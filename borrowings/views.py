@@ -1,20 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from borrowings.models import Borrowing
+from borrowings.holds import cancel_hold
+from borrowings.models import (
+    Borrowing,
+    BorrowerAccount,
+    BookCirculation,
+    BorrowingHistory,
+    DailyBorrowingStats,
+    Hold,
+)
 from borrowings.serializers import (
     BorrowingListSerializer,
     BorrowingDetailSerializer,
     BorrowingCreateSerializer,
-    BorrowingReturnSerializer
+    BorrowingReturnSerializer,
+    BorrowingListValuesSerializer,
+    BorrowingDetailValuesSerializer,
+    BorrowingCheckoutSerializer,
+    BorrowingBulkReturnSerializer,
+    BalanceSerializer,
+    DebtorSerializer,
+    HoldSerializer,
+    BorrowingStatsSerializer,
 )
+from library_service_api.exports import stream_export
+from library_service_api.fast_read import FastReadMixin
+from library_service_api.pagination import KeysetOrLimitOffsetPagination
 
 
 class BorrowingViewSet(
+    FastReadMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -22,6 +48,9 @@ class BorrowingViewSet(
 ):
     queryset = Borrowing.objects.select_related("book", "user")
     permission_classes = (IsAuthenticated, )
+    pagination_class = KeysetOrLimitOffsetPagination
+    cursor_ordering = ("-borrow_date", "-id")
+    history_actions = ("list", "retrieve", "export")
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -38,13 +67,26 @@ class BorrowingViewSet(
 
         return BorrowingListSerializer
 
+    def get_fast_serializer_class(self):
+        if self.action == "list":
+            return BorrowingListValuesSerializer
+
+        if self.action == "retrieve":
+            return BorrowingDetailValuesSerializer
+
+        return None
+
     def get_queryset(self):
         is_active = self.request.query_params.get("is_active")
         current_user = self.request.user
         queryset = self.queryset
+        if is_active != "true" and self.action in self.history_actions:
+            # Reads that may include returned borrowings also see the
+            # archive; active borrowings only live in the hot table
+            queryset = BorrowingHistory.objects.select_related("book", "user")
 
         if not current_user.is_staff:
-            queryset = queryset.filter(user=current_user)
+            queryset = queryset.filter(user_id=current_user.id)
         else:
             user_id = self.request.query_params.get("user_id")
             if user_id:
@@ -70,6 +112,205 @@ class BorrowingViewSet(
             status=status.HTTP_200_OK
         )
 
+    @extend_schema(
+        summary="Borrow many books",
+        description="Creates one borrowing per book in a single "
+                    "transaction: either every book is borrowed or none. "
+                    "Sends one notification for the whole cart.",
+        request=BorrowingCheckoutSerializer,
+        responses={201: BorrowingListSerializer(many=True)},
+    )
+    @action(methods=["POST"], detail=False)
+    def checkout(self, request):
+        """Endpoint to borrow a cart of books at once"""
+        serializer = BorrowingCheckoutSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        borrowings = serializer.save()
+
+        return Response(
+            BorrowingListSerializer(borrowings, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @extend_schema(
+        summary="Return many borrowings",
+        description="Closes all active borrowings among `ids` in one "
+                    "transaction and reports returned, already_returned "
+                    "or not_found for every id.",
+        request=BorrowingBulkReturnSerializer,
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-return",
+        permission_classes=(IsAdminUser, ),
+    )
+    def bulk_return(self, request):
+        """Endpoint for staff to return many books at once"""
+        serializer = BorrowingBulkReturnSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return Response(results, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Top debtors",
+        description="Users with the largest unpaid fines, largest first.",
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                type=OpenApiTypes.INT,
+                description="Number of users, at most "
+                            f"{settings.TOP_DEBTORS_MAX_LIMIT}",
+                required=False
+            ),
+        ],
+        responses=DebtorSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=(IsAdminUser, ),
+        pagination_class=None,
+    )
+    def debtors(self, request):
+        """Staff report of the users owing the most in fines"""
+        try:
+            limit = int(request.query_params["limit"])
+        except (KeyError, ValueError):
+            limit = settings.TOP_DEBTORS_LIMIT
+        limit = max(1, min(limit, settings.TOP_DEBTORS_MAX_LIMIT))
+
+        debtors = (
+            BorrowerAccount.objects
+            .filter(fines_balance__gt=0)
+            .order_by("-fines_balance")
+            .values("user", "fines_balance", email=F("user__email"))
+            [:limit]
+        )
+        return Response(DebtorSerializer(debtors, many=True).data)
+
+    @extend_schema(
+        summary="Borrowing statistics",
+        description="Daily borrow and return volume, average loan "
+                    "duration of the window's returns and the most "
+                    "borrowed books, read from pre-aggregated rollups.",
+        parameters=[
+            OpenApiParameter(
+                name="days",
+                type=OpenApiTypes.INT,
+                description="Window ending today, at most "
+                            f"{settings.BORROWING_STATS_MAX_DAYS} days",
+                required=False
+            ),
+        ],
+        responses=BorrowingStatsSerializer,
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=(IsAdminUser, ),
+        pagination_class=None,
+    )
+    def stats(self, request):
+        """Staff analytics served from the borrowing rollup tables"""
+        try:
+            days = int(request.query_params["days"])
+        except (KeyError, ValueError):
+            days = settings.BORROWING_STATS_DAYS
+        days = max(1, min(days, settings.BORROWING_STATS_MAX_DAYS))
+        since = timezone.now().date() - timedelta(days=days - 1)
+
+        daily = list(
+            DailyBorrowingStats.objects
+            .filter(day__gte=since)
+            .values("day")
+            .annotate(
+                borrowed=Sum("borrowed"),
+                returned=Sum("returned"),
+                loan_days=Sum("loan_days"),
+            )
+            # Left empty by rebuild_borrowing_stats corrections
+            .exclude(borrowed=0, returned=0)
+            .order_by("day")
+        )
+        returned = sum(row["returned"] for row in daily)
+        loan_days = sum(row["loan_days"] for row in daily)
+        top_books = (
+            BookCirculation.objects
+            .filter(total_borrowings__gt=0)
+            .order_by("-total_borrowings")
+            .values("book", "total_borrowings", title=F("book__title"))
+            [:settings.BORROWING_STATS_TOP_BOOKS]
+        )
+
+        return Response(
+            BorrowingStatsSerializer(
+                {
+                    "days": daily,
+                    "average_loan_days": (
+                        round(loan_days / returned, 2) if returned else None
+                    ),
+                    "top_books": top_books,
+                }
+            ).data
+        )
+
+    @extend_schema(
+        summary="Export borrowings",
+        description="Streams every borrowing matching the list filters "
+                    "as NDJSON or CSV.",
+        parameters=[
+            OpenApiParameter(
+                name="is_active",
+                type=OpenApiTypes.STR,
+                description="Filter by is_active (ex. ?is_active=true)",
+                required=False
+            ),
+            OpenApiParameter(
+                name="user_id",
+                type=OpenApiTypes.INT,
+                description="Filter by user_id for user.is_staff"
+                            " (ex. ?user_id=1)",
+                required=False
+            ),
+            OpenApiParameter(
+                name="export_format",
+                type=OpenApiTypes.STR,
+                description="ndjson (default) or csv (ex. ?export_format=csv)",
+                required=False
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.BINARY},
+    )
+    @action(methods=["GET"], detail=False)
+    def export(self, request):
+        """Endpoint to download all filtered borrowings in one response"""
+        fields = (
+            "id",
+            "borrow_date",
+            "expected_return_date",
+            "actual_return_date",
+            "book_title",
+            "user",
+        )
+        rows = (
+            self.get_queryset()
+            .values(
+                "id",
+                "borrow_date",
+                "expected_return_date",
+                "actual_return_date",
+                "user",
+                book_title=F("book__title"),
+            )
+            .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        )
+
+        return stream_export(request, rows, fields, filename="borrowings")
+
     @extend_schema(
         summary="List borrowings",
         description="Returns a list of borrowings with optional params.",
@@ -89,7 +330,91 @@ class BorrowingViewSet(
                             " (ex. ?user_id=1)",
                 required=False
             ),
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.STR,
+                description="Opt in to keyset pagination: pass an empty "
+                            "cursor for the first page, then follow the "
+                            "next/previous links (ex. ?cursor=)",
+                required=False
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
+
+
+class HoldViewSet(
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    """Queue for a copy of an out-of-stock book."""
+
+    queryset = Hold.objects.select_related("book")
+    serializer_class = HoldSerializer
+    permission_classes = (IsAuthenticated, )
+
+    def get_queryset(self):
+        queryset = self.queryset
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(user_id=self.request.user.id)
+
+        if self.action == "list":
+            queryset = queryset.filter(status__in=Hold.OPEN_STATUSES)
+
+        return queryset
+
+    @extend_schema(
+        summary="Cancel a hold",
+        description="A copy already set aside for the hold goes to the "
+                    "next patron in the queue.",
+    )
+    def destroy(self, request, *args, **kwargs):
+        hold = self.get_object()
+        if not cancel_hold(hold.id):
+            return Response(
+                {"detail": "This hold is no longer open"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BalanceView(APIView):
+    permission_classes = (IsAuthenticated, )
+
+    @extend_schema(
+        summary="Current user's fines",
+        description="`fines_balance` is charged for returned borrowings; "
+                    "`accruing_fines` is what active overdue borrowings "
+                    "would cost if returned today.",
+        responses=BalanceSerializer,
+    )
+    def get(self, request):
+        """Endpoint for the authenticated user's fines balance"""
+        fines_balance = (
+            BorrowerAccount.objects
+            .filter(user_id=request.user.id)
+            .values_list("fines_balance", flat=True)
+            .first()
+        )
+        accruing = (
+            Borrowing.objects
+            .filter(
+                user_id=request.user.id,
+                actual_return_date__isnull=True,
+                expected_return_date__lt=timezone.now().date(),
+            )
+            .with_fines()
+            .aggregate(total=Sum("fine"))["total"]
+        )
+        return Response(
+            BalanceSerializer(
+                {
+                    "fines_balance": fines_balance or 0,
+                    "accruing_fines": accruing or 0,
+                }
+            ).data
+        )
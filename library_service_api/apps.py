@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class LibraryServiceApiConfig(AppConfig):
+    name = "library_service_api"
+
+    def ready(self):
+        from library_service_api import checks  # noqa: F401
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+LOCMEM_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+DB_CACHE = "django.core.cache.backends.db.DatabaseCache"
+
+
+def cache_backend_warnings(setting: str, backends, msg: str, id: str):
+    """
+    Warn, outside DEBUG, when the cache alias named by `setting` uses one
+    of `backends`.
+    """
+    if settings.DEBUG:
+        return []
+    alias = getattr(settings, setting)
+    backend = settings.CACHES.get(alias, {}).get("BACKEND")
+    if backend not in backends:
+        return []
+    return [
+        Warning(
+            msg,
+            hint=f"Point {setting} at a Redis or Memcached cache.",
+            obj=f"settings.{setting}",
+            id=id,
+        )
+    ]
+
+
+@register(Tags.caches)
+def check_throttle_cache(app_configs, **kwargs):
+    return cache_backend_warnings(
+        "THROTTLE_CACHE",
+        (LOCMEM_CACHE, DB_CACHE),
+        "Rate limits are counted per process with a local memory cache, "
+        "and with a database cache every request costs extra queries.",
+        "library_service_api.W001",
+    )
+
+
+@register(Tags.caches)
+def check_catalog_cache(app_configs, **kwargs):
+    return cache_backend_warnings(
+        "BOOK_CATALOG_CACHE",
+        (LOCMEM_CACHE, ),
+        "The catalog version lives in a local memory cache, so each "
+        "process sees its own and serves stale catalog responses.",
+        "library_service_api.W002",
+    )
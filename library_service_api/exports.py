@@ -0,0 +1,60 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class Echo:
+    """Pseudo-buffer whose `write` returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_export(request, rows, fields, filename) -> StreamingHttpResponse:
+    """
+    Stream `rows` (an iterator of dicts, typically
+    `queryset.values(...).iterator(chunk_size=...)`) as NDJSON or CSV,
+    chosen with the `export_format` query param. Rows are encoded one at a
+    time, so memory does not grow with the size of the export.
+    """
+    export_format = request.query_params.get("export_format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError(
+            {
+                "export_format":
+                    f"Choose from: {', '.join(EXPORT_FORMATS)}"
+            }
+        )
+
+    if export_format == "csv":
+        writer = csv.writer(Echo())
+        content = (
+            writer.writerow(row) for row in _csv_rows(rows, fields)
+        )
+    else:
+        content = (
+            json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in rows
+        )
+
+    response = StreamingHttpResponse(
+        content, content_type=EXPORT_FORMATS[export_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
+
+
+def _csv_rows(rows, fields):
+    yield fields
+    for row in rows:
+        yield [row[field] for field in fields]
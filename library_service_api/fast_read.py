@@ -0,0 +1,75 @@
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.response import Response
+
+
+def date_to_representation(value):
+    """Same output as DRF's `DateField` with the default ISO 8601 format."""
+    return value.isoformat() if value is not None else None
+
+
+class ValuesSerializer(ABC):
+    """
+    Read-only counterpart of a DRF serializer that works on `.values()`
+    rows. `values` lists the lookups to fetch and `to_representation`
+    must build exactly the dict the DRF serializer would produce.
+    """
+
+    values = ()
+
+    @classmethod
+    @abstractmethod
+    def to_representation(cls, row):
+        pass
+
+    @classmethod
+    def many(cls, rows):
+        to_representation = cls.to_representation
+        return [to_representation(row) for row in rows]
+
+
+class FastReadMixin:
+    """
+    Serve `list` and `retrieve` through `ValuesSerializer`s returned by
+    `get_fast_serializer_class`, skipping model instantiation and DRF
+    field machinery. Enabled with `FAST_READ_SERIALIZERS = True`, and only
+    for the actions the view returns a fast serializer for.
+    """
+
+    def get_fast_serializer_class(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        fast_serializer = self._fast_serializer_class()
+        if fast_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.values(*fast_serializer.values)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.many(page))
+        return Response(fast_serializer.many(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        fast_serializer = self._fast_serializer_class()
+        if fast_serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            queryset.values(*fast_serializer.values),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(request, row)
+
+        return Response(fast_serializer.to_representation(row))
+
+    def _fast_serializer_class(self):
+        if not settings.FAST_READ_SERIALIZERS:
+            return None
+        return self.get_fast_serializer_class()
@@ -0,0 +1,46 @@
+import os
+
+from django.db import connections
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+def database_pool_stats(alias: str = "default") -> dict:
+    """
+    Snapshot of this process's connection pool for `alias`. Request and
+    wait counters accumulate since the pool was opened.
+    """
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return {"pooling": False}
+
+    stats = pool.get_stats()
+    requests = stats.get("requests_num", 0)
+    return {
+        "pooling": True,
+        "pid": os.getpid(),
+        "min_size": stats["pool_min"],
+        "max_size": stats["pool_max"],
+        "size": stats["pool_size"],
+        "in_use": stats["pool_size"] - stats["pool_available"],
+        "available": stats["pool_available"],
+        "waiting": stats["requests_waiting"],
+        "requests": requests,
+        "requests_queued": stats.get("requests_queued", 0),
+        "requests_errors": stats.get("requests_errors", 0),
+        "avg_acquire_ms": (
+            stats.get("requests_wait_ms", 0) / requests if requests else 0
+        ),
+        "connections_errors": stats.get("connections_errors", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+class DatabasePoolMetricsView(APIView):
+    """Connection pool statistics of the worker serving the request."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(database_pool_stats())
@@ -0,0 +1,196 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def keyset_filter(ordering, position) -> Q:
+    """
+    Build `(a, b, c) > (x, y, z)` for a mixed-direction ordering as
+    `a >= x AND (a > x OR (a = x AND b > y) OR (a = x AND b = y AND
+    c > z))`, i.e. the rows that come after `position` in `ordering`.
+    The redundant `a >= x` lets the planner turn the index on the ordering
+    into a range scan instead of evaluating the OR per row.
+    """
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+
+    first, value = ordering[0], position[0]
+    lookup = "lte" if first.startswith("-") else "gte"
+    return Q(**{f"{first.lstrip('-')}__{lookup}": value}) & condition
+
+
+class KeysetOrLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination with an opt-in keyset (cursor) mode.
+
+    Passing the `cursor` query param (empty for the first page) switches to
+    keyset mode: pages are selected with a WHERE on the view's
+    `cursor_ordering` instead of OFFSET and no COUNT(*) is run, so every
+    page costs the same. The last field of `cursor_ordering` must be unique.
+    Requests with any of the view's `cursor_excluded_params` (e.g. one that
+    orders by something else) stay on limit/offset.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        excluded = getattr(view, "cursor_excluded_params", ())
+        self.keyset = (
+            self.cursor_query_param in request.query_params
+            and not any(request.query_params.get(param) for param in excluded)
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = tuple(view.cursor_ordering)
+        position, self.reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._flip(field) for field in ordering)
+        if position is not None:
+            try:
+                position = self.clean_position(queryset.model, position)
+                queryset = queryset.filter(keyset_filter(ordering, position))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        page = list(queryset.order_by(*ordering)[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if self.reverse:
+            page.reverse()
+
+        if self.reverse:
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.first_position = self.get_position(page[0]) if page else None
+        self.last_position = self.get_position(page[-1]) if page else None
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or self.last_position is None:
+            return None
+        return self._link(self.encode_cursor(self.last_position))
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self._link(
+            self.encode_cursor(self.first_position, reverse=True)
+        )
+
+    def get_position(self, row):
+        fields = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[field] for field in fields]
+        return [getattr(row, field) for field in fields]
+
+    def encode_cursor(self, position, reverse=False):
+        payload = json.dumps(
+            {"p": position, "r": reverse}, cls=DjangoJSONEncoder
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (
+            binascii.Error, ValueError, TypeError, KeyError, AttributeError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def clean_position(self, model, position):
+        """Convert the cursor's JSON values to the ordering fields' types."""
+        return [
+            model._meta.get_field(field.lstrip("-")).to_python(value)
+            for field, value in zip(self.ordering, position)
+        ]
+
+    def _link(self, cursor):
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.offset_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over large tables. On PostgreSQL the
+    count is the planner's row estimate when that exceeds
+    `exact_count_limit`, so no page runs a full COUNT(*); smaller results
+    and other databases are counted exactly.
+    """
+
+    exact_count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            estimate = self.estimate_count(queryset, connection)
+            if estimate > self.exact_count_limit:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def estimate_count(queryset, connection) -> int:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
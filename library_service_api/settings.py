@@ -13,6 +13,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,9 +43,11 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "debug_toolbar",
     "rest_framework",
     "drf_spectacular",
+    "library_service_api",
     "books",
     "user",
     "borrowings",
@@ -93,9 +96,66 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # Also checks pooled connections before handing them out
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Keep a psycopg connection pool per worker process (WSGI or ASGI) instead
+# of opening a connection for every request. Without the pool, connections
+# can still be kept alive between requests with CONN_MAX_AGE (seconds).
+DATABASE_POOL = os.getenv("DATABASE_POOL", "False") == "True"
+
+if DATABASE_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", 10)),
+            # Seconds a request waits for a free connection before failing
+            "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", 10)),
+            "max_idle": float(os.getenv("DATABASE_POOL_MAX_IDLE", 300)),
+            "max_lifetime": float(
+                os.getenv("DATABASE_POOL_MAX_LIFETIME", 60 * 60)
+            ),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.getenv("CONN_MAX_AGE", 0)
+    )
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Rate limit counters; point at a cache shared by all workers (Redis,
+# Memcached) so the configured rates hold for the whole deployment.
+THROTTLE_CACHE = os.getenv("THROTTLE_CACHE", "default")
+
+BOOK_CATALOG_CACHE = os.getenv("BOOK_CATALOG_CACHE", "default")
+BOOK_CATALOG_CACHE_TIMEOUT = int(
+    os.getenv("BOOK_CATALOG_CACHE_TIMEOUT", 60 * 60)
+)
+
+BOOK_AUTOCOMPLETE_MIN_LENGTH = 2
+BOOK_AUTOCOMPLETE_LIMIT = 8
+BOOK_AUTOCOMPLETE_MAX_LIMIT = 20
+BOOK_AUTOCOMPLETE_CACHE_TIMEOUT = 5 * 60
+
+BOOK_BULK_BATCH_SIZE = 1000
+BOOK_BULK_MAX_BATCH_SIZE = 10_000
+BOOK_BULK_MAX_ERRORS = 1000
+
+BOOK_INVENTORY_BATCH_MAX_SIZE = 1000
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -114,6 +174,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# PBKDF2 iterations per deployment profile: "production" is Django's
+# default, "reduced" the OWASP minimum for PBKDF2-SHA256 (for onboarding
+# peaks), "development" is for local work and tests only.
+PASSWORD_HASH_PROFILES = {
+    "production": 1_000_000,
+    "reduced": 600_000,
+    "development": 1_000,
+}
+PASSWORD_HASH_PROFILE = os.getenv("PASSWORD_HASH_PROFILE", "production")
+if PASSWORD_HASH_PROFILE not in PASSWORD_HASH_PROFILES:
+    raise ImproperlyConfigured(
+        f"Unknown PASSWORD_HASH_PROFILE {PASSWORD_HASH_PROFILE!r}, expected "
+        f"one of: {', '.join(PASSWORD_HASH_PROFILES)}"
+    )
+if PASSWORD_HASH_PROFILE == "development" and not DEBUG:
+    raise ImproperlyConfigured(
+        'PASSWORD_HASH_PROFILE "development" requires DEBUG=True'
+    )
+PASSWORD_HASH_ITERATIONS = int(
+    os.getenv(
+        "PASSWORD_HASH_ITERATIONS",
+        PASSWORD_HASH_PROFILES[PASSWORD_HASH_PROFILE],
+    )
+)
+
+PASSWORD_HASHERS = [
+    "user.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 AUTH_USER_MODEL = "user.User"
 
 # Internationalization
@@ -142,17 +235,60 @@ MEDIA_ROOT = "/files/media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Serve list/retrieve of books and borrowings from .values() rows instead of
+# DRF model serializers (same JSON output, see library_service_api/fast_read).
+# Opt-in: the hand-written serializers must be kept in step with the DRF ones.
+FAST_READ_SERIALIZERS = os.getenv("FAST_READ_SERIALIZERS", "False") == "True"
+
+# Rows fetched per round trip (server-side cursor on PostgreSQL) when
+# streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Active borrowings a user may hold at once
+MAX_ACTIVE_BORROWINGS_PER_USER = int(
+    os.getenv("MAX_ACTIVE_BORROWINGS_PER_USER", 10)
+)
+
+# Days a copy set aside for a ready hold waits for its patron before
+# `expire_holds` passes it to the next one in the queue
+HOLD_READY_DAYS = int(os.getenv("HOLD_READY_DAYS", 3))
+
+# Returned borrowings older than this are moved to the archive table by
+# the archive_borrowings command
+BORROWING_ARCHIVE_AFTER_MONTHS = int(
+    os.getenv("BORROWING_ARCHIVE_AFTER_MONTHS", 12)
+)
+
+# Books accepted by one checkout request
+BORROWING_CHECKOUT_MAX_BOOKS = 20
+
+# Borrowing ids accepted by one bulk return request
+BORROWING_BULK_RETURN_MAX_SIZE = 1000
+
+# Rows per day in the borrowing stats rollup; more shards mean less lock
+# contention between concurrent borrowings and returns
+BORROWING_STATS_SHARDS = 8
+
+# Window (in days) and number of top books of /api/borrowings/stats/
+BORROWING_STATS_DAYS = 30
+BORROWING_STATS_MAX_DAYS = 366
+BORROWING_STATS_TOP_BOOKS = 10
+
+# Rows in the staff top debtors report (?limit= is capped at the max)
+TOP_DEBTORS_LIMIT = 10
+TOP_DEBTORS_MAX_LIMIT = 100
+
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "library_service_api.throttling.AnonRateThrottle",
+        "library_service_api.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "100/minute", "user": "300/minute"},
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.StatelessJWTAuthentication",
     ),
 }
 
@@ -173,5 +309,22 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
-    "AUTH_HEADER_NAME": "HTTP_AUTHORIZE"
+    "AUTH_HEADER_NAME": "HTTP_AUTHORIZE",
+    "TOKEN_OBTAIN_SERIALIZER":
+        "user.serializers.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER":
+        "user.serializers.ClaimsTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER":
+        "user.serializers.ClaimsTokenVerifySerializer",
 }
+
+# Per-process cache of full user models for views that need more than the
+# token claims (seconds, entries)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+USER_CACHE_MAX_SIZE = 10_000
+
+# Seconds between a worker's syncs of revoked tokens from the database; the
+# longest a revocation made by another worker can go unnoticed
+TOKEN_REVOCATION_SYNC_INTERVAL = float(
+    os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 5)
+)
@@ -0,0 +1,113 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from library_service_api.checks import (
+    check_catalog_cache,
+    check_throttle_cache,
+)
+from library_service_api.throttling import SlidingWindowRateThrottle
+
+
+class FixedKeyThrottle(SlidingWindowRateThrottle):
+    rate = "4/min"
+    now = 600.0
+
+    def timer(self):
+        return FixedKeyThrottle.now
+
+    def get_cache_key(self, request, view):
+        return "throttle_test_client"
+
+
+@override_settings(THROTTLE_CACHE="default")
+class SlidingWindowRateThrottleTests(TestCase):
+    def setUp(self) -> None:
+        FixedKeyThrottle().cache.clear()
+        FixedKeyThrottle.now = 600.0
+
+    def allowed(self, count: int) -> list[bool]:
+        return [
+            FixedKeyThrottle().allow_request(None, None)
+            for _ in range(count)
+        ]
+
+    def test_limit_is_shared_by_throttle_instances(self):
+        self.assertEqual(self.allowed(6), [True] * 4 + [False] * 2)
+
+        throttle = FixedKeyThrottle()
+        self.assertFalse(throttle.allow_request(None, None))
+        self.assertEqual(throttle.wait(), 60)
+
+    def test_refused_requests_are_not_counted(self):
+        self.allowed(10)
+        FixedKeyThrottle.now += 60
+
+        throttle = FixedKeyThrottle()
+        self.assertEqual(throttle.cache.get("throttle_test_client:10"), 4)
+        self.assertFalse(throttle.allow_request(None, None))
+
+    def test_previous_window_weight_decays(self):
+        self.allowed(4)
+        FixedKeyThrottle.now += 90
+
+        # Half of the previous window still overlaps: 4 * 0.5 + 2 = 4.
+        self.assertEqual(self.allowed(3), [True, True, False])
+
+        throttle = FixedKeyThrottle()
+        self.assertFalse(throttle.allow_request(None, None))
+        self.assertEqual(throttle.wait(), 15)
+
+        FixedKeyThrottle.now += 15
+        self.assertEqual(self.allowed(2), [True, False])
+
+
+class CacheBackendCheckTests(SimpleTestCase):
+    @override_settings(
+        DEBUG=False,
+        THROTTLE_CACHE="default",
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }},
+    )
+    def test_local_throttle_cache_warns_in_production(self):
+        warnings = check_throttle_cache(None)
+
+        self.assertEqual(
+            [warning.id for warning in warnings],
+            ["library_service_api.W001"],
+        )
+
+    @override_settings(
+        DEBUG=True,
+        THROTTLE_CACHE="default",
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }},
+    )
+    def test_local_throttle_cache_is_fine_in_debug(self):
+        self.assertEqual(check_throttle_cache(None), [])
+
+    @override_settings(
+        DEBUG=False,
+        THROTTLE_CACHE="default",
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379",
+        }},
+    )
+    def test_shared_throttle_cache_passes(self):
+        self.assertEqual(check_throttle_cache(None), [])
+
+    @override_settings(
+        DEBUG=False,
+        BOOK_CATALOG_CACHE="default",
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }},
+    )
+    def test_local_catalog_cache_warns_in_production(self):
+        warnings = check_catalog_cache(None)
+
+        self.assertEqual(
+            [warning.id for warning in warnings],
+            ["library_service_api.W002"],
+        )
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import throttling
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    """
+    Rate limit with a sliding window counter kept in a shared cache.
+
+    Each client has one integer counter per fixed window. A request
+    increments the current window's counter atomically and weights the
+    previous window's counter by how much of it still overlaps the
+    sliding window, so a check is one INCR and one GET however many
+    requests are allowed, and every worker sees the same count as long as
+    `THROTTLE_CACHE` points at a shared backend (Redis, Memcached). Refused
+    requests are given back, so they don't eat into the next window.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        self.count = self.increment(current_key)
+        self.previous = self.cache.get(f"{self.key}:{int(window) - 1}", 0)
+
+        if self.estimate(self.elapsed) > self.num_requests:
+            self.cache.decr(current_key)
+            self.count -= 1
+            return self.throttle_failure()
+        return True
+
+    def increment(self, key: str) -> int:
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # The window's first request; the counter must outlive the next
+            # window, which still reads it as the previous one.
+            if self.cache.add(key, 1, timeout=self.duration * 2):
+                return 1
+            return self.cache.incr(key)
+
+    def estimate(self, elapsed: float) -> float:
+        overlap = 1 - elapsed / self.duration
+        return self.previous * overlap + self.count
+
+    def wait(self):
+        if self.count + 1 > self.num_requests or not self.previous:
+            return self.duration - self.elapsed
+        # Time until the previous window's weight has decayed enough to
+        # leave room for one more request in the current one.
+        overlap = (self.num_requests - self.count - 1) / self.previous
+        return max(
+            self.duration * (1 - overlap) - self.elapsed, 0
+        )
+
+
+class AnonRateThrottle(
+    SlidingWindowRateThrottle, throttling.AnonRateThrottle
+):
+    pass
+
+
+class UserRateThrottle(
+    SlidingWindowRateThrottle, throttling.UserRateThrottle
+):
+    pass
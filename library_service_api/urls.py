@@ -19,10 +19,17 @@ from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from library_service_api.metrics import DatabasePoolMetricsView
+
 urlpatterns = [
     path("api/user/", include("user.urls", namespace="user")),
     path("api/", include("books.urls", namespace="books")),
     path("api/", include("borrowings.urls", namespace="borrowings")),
+    path(
+        "api/metrics/db-pool/",
+        DatabasePoolMetricsView.as_view(),
+        name="db-pool-metrics",
+    ),
     path("admin/", admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.utils.translation import gettext as _
 
+from library_service_api.pagination import EstimatedCountPaginator
 from .models import User
 
 
@@ -38,3 +39,5 @@ class UserAdmin(DjangoUserAdmin):
     list_display = ("email", "first_name", "last_name", "is_staff")
     search_fields = ("email", "first_name", "last_name")
     ordering = ("email",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,53 @@
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+
+from user.revocation import revocations
+from user.tokens import USER_CLAIMS
+
+
+class ClaimsUser(TokenUser):
+    """Authenticated user built from signed token claims, not the DB."""
+
+    @cached_property
+    def email(self) -> str:
+        return self.token["email"]
+
+    @cached_property
+    def is_active(self) -> bool:
+        return self.token["is_active"]
+
+    def __str__(self) -> str:
+        return self.email
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the `USER_CLAIMS` signed into tokens by
+    `ClaimsRefreshToken` instead of selecting the user on every request.
+    Tokens issued without those claims fall back to the database lookup.
+    Views that need the full model use `user.cache.get_cached_user`.
+    Revocation is checked against the in-process `revocations` registry.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocations.is_revoked(validated_token.payload):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user
@@ -0,0 +1,36 @@
+import copy
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+
+# str(user id) -> (expires at, user); per process, bounded by
+# USER_CACHE_MAX_SIZE. Keys are strings because token claims may carry the
+# id as one.
+_users = {}
+
+
+def get_cached_user(user_id):
+    """
+    Return the full user model for `user_id`, re-read from the database at
+    most every `USER_CACHE_TTL` seconds per process. Callers get their own
+    copy, so changing it does not leak into other requests.
+    """
+    key = str(user_id)
+    entry = _users.get(key)
+    now = time.monotonic()
+    if entry is None or entry[0] <= now:
+        user = get_user_model().objects.get(pk=user_id)
+        if len(_users) >= settings.USER_CACHE_MAX_SIZE:
+            _users.pop(next(iter(_users), None), None)
+        entry = _users[key] = (now + settings.USER_CACHE_TTL, user)
+    return copy.copy(entry[1])
+
+
+def invalidate_cached_user(user_id) -> None:
+    _users.pop(str(user_id), None)
+
+
+def clear_user_cache() -> None:
+    _users.clear()
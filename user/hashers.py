@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    must_update_salt,
+)
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the iteration count taken from
+    `PASSWORD_HASH_ITERATIONS`. Hashes keep the `pbkdf2_sha256` format, so
+    existing ones still verify. Hashes below the configured cost are
+    re-hashed on the user's next login; stronger ones are kept, so a
+    cheaper profile never downgrades them.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PASSWORD_HASH_ITERATIONS
+
+    def must_update(self, encoded) -> bool:
+        decoded = self.decode(encoded)
+        return decoded["iterations"] < self.iterations or must_update_salt(
+            decoded["salt"], self.salt_entropy
+        )
@@ -0,0 +1,99 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from books.models import Book
+from borrowings.models import Borrowing
+from borrowings.views import BorrowingViewSet
+from user.cache import clear_user_cache
+from user.tokens import ClaimsRefreshToken
+from user.views import ManagerUserView
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests per second and queries per request of database "
+        "JWT authentication (tokens without user claims) and stateless "
+        "claims authentication on /api/borrowings/ and /api/user/me/. "
+        "Test rows are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.seed()
+            tokens = (
+                ("database", RefreshToken.for_user(user).access_token),
+                ("claims", ClaimsRefreshToken.for_user(user).access_token),
+            )
+            views = (
+                (
+                    "/api/borrowings/",
+                    BorrowingViewSet.as_view(
+                        {"get": "list"}, throttle_classes=()
+                    ),
+                ),
+                (
+                    "/api/user/me/",
+                    ManagerUserView.as_view(throttle_classes=()),
+                ),
+            )
+
+            self.stdout.write(
+                f"{'endpoint':<20}{'auth':<10}{'req/s':>10}{'queries':>10}"
+            )
+            for path, view in views:
+                for label, token in tokens:
+                    clear_user_cache()
+                    rate, queries = self.measure(
+                        view, path, token, options["requests"]
+                    )
+                    self.stdout.write(
+                        f"{path:<20}{label:<10}{rate:>10,.0f}{queries:>10.2f}"
+                    )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def seed():
+        user = get_user_model().objects.create_user(
+            "auth-benchmark@example.com"
+        )
+        book = Book.objects.create(
+            title="Auth benchmark",
+            author="Author",
+            cover=Book.Cover.SOFT,
+            inventory=10,
+            daily_fee="1.00",
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=date.today() + timedelta(days=7),
+                book=book,
+                user=user,
+            )
+            for _ in range(5)
+        )
+        return user
+
+    @staticmethod
+    def measure(view, path, token, requests):
+        factory = APIRequestFactory()
+        header = {"HTTP_AUTHORIZE": f"Bearer {token}"}
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = view(factory.get(path, **header))
+                response.render()
+            elapsed = time.perf_counter() - start
+
+        return requests / elapsed, len(queries) / requests
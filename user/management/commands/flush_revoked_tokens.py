@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from user.models import RevokedToken, TokenCutoff
+from user.revocation import token_lifetime
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete revoked tokens that have expired and token cutoffs older "
+        "than the longest token lifetime; neither can match a usable token."
+    )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        tokens, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+        cutoffs, _ = TokenCutoff.objects.filter(
+            issued_before__lte=now - token_lifetime()
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {tokens} revoked tokens and {cutoffs} cutoffs"
+            )
+        )
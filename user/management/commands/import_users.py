@@ -0,0 +1,142 @@
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from user.serializers import UserSerializer
+
+
+class ImportedUserSerializer(serializers.Serializer):
+    """A CSV row, held to the same rules as registration."""
+
+    email = serializers.EmailField(
+        max_length=get_user_model()._meta.get_field("email").max_length
+    )
+    password = serializers.CharField(
+        **UserSerializer.Meta.extra_kwargs["password"]
+    )
+    first_name = serializers.CharField(
+        max_length=150, allow_blank=True, required=False
+    )
+    last_name = serializers.CharField(
+        max_length=150, allow_blank=True, required=False
+    )
+
+    def validate_email(self, value):
+        return get_user_model().objects.normalize_email(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file with `email` and `password` columns "
+        "(plus optional `first_name` and `last_name`). Rows are validated "
+        "like registrations, passwords are hashed across a pool of "
+        "processes and users inserted with bulk_create; emails that "
+        "already exist are skipped. Reports users per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="CSV file to read, or - for standard input"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Hashing processes (default: number of CPUs)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["path"] == "-":
+            rows, rejected, duplicates = self.read_rows(sys.stdin)
+        else:
+            with open(options["path"], newline="") as file:
+                rows, rejected, duplicates = self.read_rows(file)
+
+        for line, errors in rejected:
+            self.stderr.write(f"Line {line} rejected: {errors}")
+
+        started = time.perf_counter()
+        created = 0
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], initializer=django.setup
+        ) as pool:
+            for start in range(0, len(rows), options["batch_size"]):
+                created += self.import_batch(
+                    pool, rows[start:start + options["batch_size"]], options
+                )
+        elapsed = time.perf_counter() - started
+
+        skipped = len(rows) - created + duplicates
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {created} users ({skipped} skipped as existing "
+                f"or duplicate, {len(rejected)} rejected) in {elapsed:.1f}s, "
+                f"{created / elapsed:.0f} users/s "
+                f"({settings.PASSWORD_HASH_ITERATIONS} PBKDF2 iterations, "
+                f"{options['workers']} workers)"
+            )
+        )
+
+    @staticmethod
+    def read_rows(file) -> tuple[list[dict], list[tuple], int]:
+        """
+        Return the valid rows (first one per email), the rejected ones as
+        `(line, errors)` and the number of repeated emails.
+        """
+        reader = csv.DictReader(file)
+        if not reader.fieldnames or not {"email", "password"} <= set(
+            reader.fieldnames
+        ):
+            raise CommandError("CSV needs `email` and `password` columns")
+
+        rows = {}
+        rejected = []
+        duplicates = 0
+        for row in reader:
+            serializer = ImportedUserSerializer(data=row)
+            if not serializer.is_valid():
+                rejected.append((reader.line_num, dict(serializer.errors)))
+            elif serializer.validated_data["email"] in rows:
+                duplicates += 1
+            else:
+                data = serializer.validated_data
+                rows[data["email"]] = data
+        return list(rows.values()), rejected, duplicates
+
+    @staticmethod
+    def import_batch(pool, rows, options) -> int:
+        user_model = get_user_model()
+        existing = set(
+            user_model.objects.filter(
+                email__in=[row["email"] for row in rows]
+            ).values_list("email", flat=True)
+        )
+        rows = [row for row in rows if row["email"] not in existing]
+        passwords = pool.map(
+            make_password,
+            [row["password"] for row in rows],
+            chunksize=max(len(rows) // (options["workers"] * 4), 1),
+        )
+        users = [
+            user_model(
+                email=row["email"],
+                password=password,
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", ""),
+            )
+            for row, password in zip(rows, passwords)
+        ]
+        user_model.objects.bulk_create(
+            users, batch_size=options["batch_size"], ignore_conflicts=True
+        )
+        return len(users)
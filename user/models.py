@@ -1,6 +1,7 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 
@@ -46,3 +47,37 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # Tokens carry is_staff as a claim, so a change to it is detected
+        # on save (see user.signals). None when the field was deferred.
+        user._loaded_is_staff = user.__dict__.get("is_staff")
+        return user
+
+
+class RevokedToken(models.Model):
+    """A single token (refresh or access) revoked before it expired."""
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self) -> str:
+        return self.jti
+
+
+class TokenCutoff(models.Model):
+    """Every token of `user` issued at or before `issued_before` is revoked."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="token_cutoff",
+    )
+    issued_before = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.user_id}: {self.issued_before}"
@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from user.models import RevokedToken, TokenCutoff
+
+
+# Each sync re-reads this far behind the previous one, so a revocation whose
+# transaction commits after a later one (or on a server with a slightly
+# different clock) is still picked up.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def token_lifetime() -> timedelta:
+    return max(
+        api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME
+    )
+
+
+class RevocationRegistry:
+    """
+    Per-process copy of the revocation tables: revoked `jti`s and per-user
+    "issued before" cutoffs, both as epoch seconds in dicts, so a check is
+    two hash lookups. The copy is brought up to date with rows changed
+    since the last sync at most every `TOKEN_REVOCATION_SYNC_INTERVAL`
+    seconds; entries that can no longer match an unexpired token are
+    dropped on sync, which keeps the copy small.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.jtis = {}
+        self.cutoffs = {}
+        self.synced_at = None
+        self.watermark = None
+
+    def is_revoked(self, payload) -> bool:
+        if (
+            self.synced_at is None
+            or time.monotonic() - self.synced_at
+            >= settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        ):
+            self.sync()
+        if payload.get(api_settings.JTI_CLAIM) in self.jtis:
+            return True
+        cutoff = self.cutoffs.get(
+            str(payload.get(api_settings.USER_ID_CLAIM))
+        )
+        return cutoff is not None and payload.get("iat", 0) <= cutoff
+
+    def sync(self) -> None:
+        # Only the first sync makes other threads wait; later ones let them
+        # check against the current copy meanwhile.
+        if not self.lock.acquire(blocking=self.synced_at is None):
+            return
+        try:
+            now = timezone.now()
+            since = (
+                self.watermark - SYNC_OVERLAP
+                if self.watermark
+                else now - token_lifetime()
+            )
+            jtis = {
+                jti: expires_at.timestamp()
+                for jti, expires_at in RevokedToken.objects.filter(
+                    revoked_at__gte=since, expires_at__gt=now
+                ).values_list("jti", "expires_at")
+            }
+            cutoffs = {
+                str(user_id): issued_before.timestamp()
+                for user_id, issued_before in TokenCutoff.objects.filter(
+                    issued_before__gte=since
+                ).values_list("user_id", "issued_before")
+            }
+            self.merge(jtis, cutoffs, now.timestamp())
+            self.watermark = now
+            self.synced_at = time.monotonic()
+        finally:
+            self.lock.release()
+
+    def merge(self, jtis, cutoffs, now: float) -> None:
+        # New dicts are swapped in whole, so readers never see one mid-update.
+        oldest = now - token_lifetime().total_seconds()
+        self.jtis = {
+            jti: expires
+            for jti, expires in {**self.jtis, **jtis}.items()
+            if expires > now
+        }
+        self.cutoffs = {
+            user_id: cutoff
+            for user_id, cutoff in {**self.cutoffs, **cutoffs}.items()
+            if cutoff > oldest
+        }
+
+
+revocations = RevocationRegistry()
+
+
+def revoke_token(token) -> None:
+    """Revoke a single token by its `jti` until it expires."""
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.get_or_create(
+        jti=jti, defaults={"expires_at": datetime_from_epoch(token["exp"])}
+    )
+    transaction.on_commit(
+        lambda: revocations.merge(
+            {jti: token["exp"]}, {}, time.time()
+        )
+    )
+
+
+def revoke_user_tokens(user_id) -> None:
+    """Revoke every token issued to the user up to now."""
+    now = timezone.now()
+    TokenCutoff.objects.update_or_create(
+        user_id=user_id, defaults={"issued_before": now}
+    )
+    transaction.on_commit(
+        lambda: revocations.merge(
+            {}, {str(user_id): now.timestamp()}, time.time()
+        )
+    )
@@ -1,5 +1,16 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.tokens import AccessToken, UntypedToken
+
+from user.cache import invalidate_cached_user
+from user.revocation import revocations, revoke_token
+from user.tokens import ClaimsRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -20,5 +31,35 @@ class UserSerializer(serializers.ModelSerializer):
         if password:
             user.set_password(password)
             user.save()
+        invalidate_cached_user(user.id)
 
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if revocations.is_revoked(UntypedToken(attrs["token"]).payload):
+            raise TokenError("Token is revoked")
+        return data
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(write_only=True)
+    access = serializers.CharField(write_only=True, required=False)
+
+    def validate(self, attrs):
+        tokens = [ClaimsRefreshToken(attrs["refresh"])]
+        if "access" in attrs:
+            tokens.append(AccessToken(attrs["access"]))
+        for token in tokens:
+            revoke_token(token)
+        return {}
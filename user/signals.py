@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from user.cache import invalidate_cached_user
+from user.models import User
+from user.revocation import revoke_user_tokens
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_claims_change(sender, instance, created, **kwargs):
+    """
+    Drop the user from this process's user cache, and revoke the tokens of
+    a user who was deactivated or whose `is_staff` changed, since issued
+    tokens still carry the old claims.
+    """
+    invalidate_cached_user(instance.pk)
+    loaded_is_staff = getattr(instance, "_loaded_is_staff", None)
+    instance._loaded_is_staff = instance.is_staff
+    update_fields = kwargs["update_fields"]
+    if created or (
+        update_fields is not None
+        and not {"is_active", "is_staff"} & set(update_fields)
+    ):
+        return
+    if not instance.is_active or (
+        loaded_is_staff is not None and loaded_is_staff != instance.is_staff
+    ):
+        revoke_user_tokens(instance.pk)
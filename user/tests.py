@@ -1,15 +1,27 @@
+import io
+import tempfile
+
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.timezone import now
 
+from user.cache import clear_user_cache
+from user.models import TokenCutoff
+from user.revocation import revocations
 from user.serializers import UserSerializer
 
 
 class UserApiTest(TestCase):
     def setUp(self) -> None:
+        clear_user_cache()
         self.client = APIClient()
 
     def test_create_and_manage_user(self) -> None:
@@ -42,3 +54,319 @@ class UserApiTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(user.email, updated_data["email"])
         self.assertTrue(user.check_password(updated_data["password"]))
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        clear_user_cache()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@user.com", "test123user"
+        )
+
+    def login(self):
+        res = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "test@user.com", "password": "test123user"},
+        )
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {res.data['access']}")
+        return res.data
+
+    def user_selects(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [
+            query["sql"] for query in queries.captured_queries
+            if 'FROM "user_user"' in query["sql"]
+        ]
+
+    def test_requests_authenticate_from_claims(self):
+        self.login()
+
+        self.assertEqual(
+            self.user_selects(reverse("borrowings:borrowing-list")), []
+        )
+
+    def test_full_user_is_cached_and_invalidated_on_update(self):
+        self.login()
+        clear_user_cache()
+        self.assertEqual(len(self.user_selects(reverse("user:manage"))), 1)
+        self.assertEqual(self.user_selects(reverse("user:manage")), [])
+
+        self.client.patch(reverse("user:manage"), {"email": "new@user.com"})
+
+        self.assertEqual(
+            self.client.get(reverse("user:manage")).data["email"],
+            "new@user.com",
+        )
+
+    def test_update_does_not_overwrite_changes_with_cached_user(self):
+        self.login()
+        self.client.get(reverse("user:manage"))
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_staff=True
+        )
+
+        self.client.patch(reverse("user:manage"), {"email": "new@user.com"})
+        self.user.refresh_from_db()
+
+        self.assertTrue(self.user.is_staff)
+        self.assertEqual(self.user.email, "new@user.com")
+
+    def test_login_after_promotion_carries_new_claims(self):
+        self.login()
+        self.client.get(reverse("user:manage"))
+        self.user.is_staff = True
+        self.user.save()
+
+        access = AccessToken(self.login()["access"])
+
+        self.assertTrue(access["is_staff"])
+        self.assertTrue(
+            self.client.get(reverse("user:manage")).data["is_staff"]
+        )
+
+    def test_refresh_picks_up_current_claims(self):
+        tokens = self.login()
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_staff=True
+        )
+        clear_user_cache()
+
+        res = self.client.post(
+            reverse("user:token_refresh"), {"refresh": tokens["refresh"]}
+        )
+
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {res.data['access']}")
+        self.assertEqual(
+            self.client.get(
+                reverse("borrowings:borrowing-debtors")
+            ).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_refresh_rejected_for_inactive_user(self):
+        tokens = self.login()
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+        clear_user_cache()
+
+        res = self.client.post(
+            reverse("user:token_refresh"), {"refresh": tokens["refresh"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_without_claims_use_database(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {token}")
+
+        self.assertEqual(
+            len(self.user_selects(reverse("borrowings:borrowing-list"))), 1
+        )
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        revocations.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@user.com", "test123user"
+        )
+        self.tokens = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "test@user.com", "password": "test123user"},
+        ).data
+
+    def get_borrowings(self, access):
+        self.client.credentials(HTTP_AUTHORIZE=f"Bearer {access}")
+        return self.client.get(reverse("borrowings:borrowing-list"))
+
+    def refresh(self):
+        return self.client.post(
+            reverse("user:token_refresh"),
+            {"refresh": self.tokens["refresh"]},
+        )
+
+    def test_checks_do_not_query_between_syncs(self):
+        self.get_borrowings(self.tokens["access"])
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.get_borrowings(self.tokens["access"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            [
+                query for query in queries.captured_queries
+                if "user_revokedtoken" in query["sql"]
+                or "user_tokencutoff" in query["sql"]
+            ]
+        )
+
+    def revoke(self, **tokens):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("user:token_revoke"), tokens)
+
+    def verify(self, token):
+        return self.client.post(
+            reverse("user:token_verify"), {"token": token}
+        )
+
+    def test_revoked_refresh_token_is_rejected(self):
+        res = self.revoke(refresh=self.tokens["refresh"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.refresh().status_code, status.HTTP_401_UNAUTHORIZED
+        )
+        self.assertEqual(
+            self.verify(self.tokens["refresh"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_revoking_access_token_with_refresh_token(self):
+        res = self.revoke(
+            refresh=self.tokens["refresh"], access=self.tokens["access"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(
+            self.get_borrowings(self.tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.assertEqual(
+            self.verify(self.tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_deactivation_revokes_issued_tokens(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertEqual(
+            self.get_borrowings(self.tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        self.assertEqual(
+            self.refresh().status_code, status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_staff_change_revokes_issued_tokens(self):
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.is_staff = True
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(update_fields=["is_staff"])
+
+        self.assertEqual(
+            self.get_borrowings(self.tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+    def test_unrelated_change_keeps_tokens(self):
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.first_name = "Test"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        self.assertFalse(TokenCutoff.objects.exists())
+        self.assertEqual(
+            self.get_borrowings(self.tokens["access"]).status_code,
+            status.HTTP_200_OK,
+        )
+
+    @override_settings(TOKEN_REVOCATION_SYNC_INTERVAL=0)
+    def test_revocations_from_other_workers_are_synced(self):
+        self.assertEqual(
+            self.get_borrowings(self.tokens["access"]).status_code,
+            status.HTTP_200_OK,
+        )
+        TokenCutoff.objects.create(user=self.user, issued_before=now())
+
+        self.assertEqual(
+            self.get_borrowings(self.tokens["access"]).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+
+
+class UserAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                "admin@test.com", is_staff=True, is_superuser=True
+            )
+        )
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("admin:user_user_changelist"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        few = self.changelist_queries()
+        get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{i}@test.com") for i in range(50)
+        )
+
+        self.assertEqual(self.changelist_queries(), few)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1_000)
+class ImportUsersTests(TestCase):
+    def import_users(self, content: str) -> tuple[str, str]:
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(content)
+            file.flush()
+            out, err = io.StringIO(), io.StringIO()
+            call_command(
+                "import_users",
+                file.name,
+                "--workers",
+                "1",
+                stdout=out,
+                stderr=err,
+            )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_hashes_passwords_and_skips_existing(self):
+        get_user_model().objects.create_user("old@user.com", "test123user")
+
+        out, err = self.import_users(
+            "email,password,first_name\n"
+            "new@USER.com,secret123,New\n"
+            "old@user.com,other123,\n"
+            "new@USER.com,duplicate,\n"
+            "nopass@user.com,,\n"
+            "not-an-email,secret123,\n"
+            "short@user.com,1234,\n"
+        )
+
+        self.assertIn(
+            "Imported 1 users (2 skipped as existing or duplicate, "
+            "3 rejected)",
+            out,
+        )
+        self.assertEqual(
+            [line.split(" rejected")[0] for line in err.splitlines()],
+            ["Line 5", "Line 6", "Line 7"],
+        )
+        user = get_user_model().objects.get(email="new@user.com")
+        self.assertEqual(user.first_name, "New")
+        self.assertTrue(user.check_password("secret123"))
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_password_is_rehashed_to_configured_iterations(self):
+        user = get_user_model().objects.create_user(
+            "test@user.com", "test123user"
+        )
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=2_000):
+            self.assertTrue(user.check_password("test123user"))
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+
+        self.assertTrue(user.check_password("test123user"))
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.revocation import revocations
+
+
+# Claims StatelessJWTAuthentication builds request.user from
+USER_CLAIMS = ("email", "is_staff", "is_active")
+
+
+def set_user_claims(token, user) -> None:
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying `USER_CLAIMS`. Access tokens minted from it get
+    the user's current claims, read from the database rather than the
+    per-process user cache, so a refresh or login picks up changes such as
+    a revoked staff flag straight away. Revoked
+    refresh tokens are rejected.
+    """
+
+    def verify(self):
+        super().verify()
+        if revocations.is_revoked(self.payload):
+            raise TokenError("Token is revoked")
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        try:
+            user = get_user_model().objects.get(
+                pk=self[api_settings.USER_ID_CLAIM]
+            )
+        except (KeyError, get_user_model().DoesNotExist):
+            raise TokenError("Token user not found")
+        if not user.is_active:
+            raise TokenError("User is inactive")
+        set_user_claims(access, user)
+        return access
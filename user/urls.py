@@ -5,7 +5,8 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
-from user.views import CreateUserView, ManagerUserView
+from borrowings.views import BalanceView
+from user.views import CreateUserView, ManagerUserView, TokenRevokeView
 
 
 urlpatterns = [
@@ -19,6 +20,11 @@ urlpatterns = [
         ManagerUserView.as_view(),
         name="manage"
     ),
+    path(
+        "me/balance/",
+        BalanceView.as_view(),
+        name="balance"
+    ),
     path(
         "token/",
         TokenObtainPairView.as_view(),
@@ -34,6 +40,11 @@ urlpatterns = [
         TokenVerifyView.as_view(),
         name="token_verify"
     ),
+    path(
+        "token/revoke/",
+        TokenRevokeView.as_view(),
+        name="token_revoke"
+    ),
 ]
 
 
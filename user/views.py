@@ -1,7 +1,10 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework_simplejwt.views import TokenViewBase
 
-from user.serializers import UserSerializer
+from user.cache import get_cached_user
+from user.serializers import TokenRevokeSerializer, UserSerializer
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -14,4 +17,13 @@ class ManagerUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated, )
 
     def get_object(self):
-        return self.request.user
+        if self.request.method in SAFE_METHODS:
+            return get_cached_user(self.request.user.id)
+        # Saving writes every column, so updates start from the current row
+        return get_user_model().objects.get(pk=self.request.user.id)
+
+
+class TokenRevokeView(TokenViewBase):
+    """Revoke a refresh token and optionally its access token on logout."""
+
+    serializer_class = TokenRevokeSerializer